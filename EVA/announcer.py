@@ -0,0 +1,107 @@
+from __future__ import annotations
+import threading, time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from config import CLASS_PRIORITY, ANNOUNCE_DEADLINE_MS, ANNOUNCE_PREEMPT_LABELS
+
+
+@dataclass
+class Prompt:
+    label: Optional[str]
+    payload: object             # what the backend plays: phrase text, clip key, ...
+    times: int = 1
+    rank: int = 0
+    t_first: float = field(default_factory=time.perf_counter)   # first submit, for latency
+    t_last: float = 0.0                                         # latest submit, for the deadline
+
+    def __post_init__(self) -> None:
+        self.t_last = self.t_last or self.t_first
+
+
+class Announcer:
+    """Pending prompts of one voice backend, highest CLASS_PRIORITY first.
+
+    A prompt already pending (or playing) for the same label is merged rather than queued twice.
+    Prompts not re-submitted within `deadline_ms` are dropped. A label in `preempt_labels` that
+    outranks the playing prompt sets `preempted` and calls `on_preempt`, so the backend can cut
+    the audio short. The backend reports started() when sound begins, which gives the
+    submit-to-audio latency."""
+
+    def __init__(self, priority: Sequence[str] = CLASS_PRIORITY, deadline_ms: float = ANNOUNCE_DEADLINE_MS,
+                 preempt_labels: Sequence[str] = ANNOUNCE_PREEMPT_LABELS) -> None:
+        self._rank = {lab: i for i, lab in enumerate(priority)}
+        self.deadline_s = float(deadline_ms) / 1000.0
+        self.preempt_labels = set(preempt_labels)
+        self._cv = threading.Condition()
+        self._pending: List[Prompt] = []
+        self.current: Optional[Prompt] = None
+        self.preempted = threading.Event()
+        self.on_preempt: Optional[Callable[[], None]] = None
+        self.on_latency: Optional[Callable[[float], None]] = None
+        self.latency_ms: Optional[float] = None
+        self.counts: Dict[str, int] = {"submitted": 0, "merged": 0, "dropped": 0, "preempted": 0, "played": 0}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def rank(self, label: Optional[str]) -> int:
+        if label is None:
+            return len(self._rank) + 1
+        return self._rank.get(label, len(self._rank))
+
+    def submit(self, label: Optional[str], payload, times: int = 1) -> None:
+        now = time.perf_counter()
+        preempt = False
+        with self._cv:
+            self.counts["submitted"] += 1
+            key = label if label is not None else payload
+            cur = self.current
+            if cur is not None and (cur.label if cur.label is not None else cur.payload) == key and cur.payload == payload:
+                self.counts["merged"] += 1
+                return
+            for p in self._pending:
+                if (p.label if p.label is not None else p.payload) == key:
+                    p.payload, p.times, p.t_last = payload, max(p.times, int(times)), now
+                    self.counts["merged"] += 1
+                    break
+            else:
+                self._pending.append(Prompt(label, payload, max(1, int(times)), self.rank(label), now))
+            if label in self.preempt_labels and cur is not None and self.rank(label) < cur.rank:
+                preempt = True
+                self.counts["preempted"] += 1
+                self.preempted.set()
+            self._cv.notify()
+        if preempt and self.on_preempt is not None:
+            self.on_preempt()
+
+    def next(self, timeout: float = 0.1) -> Optional[Prompt]:
+        """Highest-priority fresh prompt (oldest first within a class), or None after `timeout`."""
+        with self._cv:
+            self.current = None
+            self.preempted.clear()
+            end = time.perf_counter() + timeout
+            while True:
+                now = time.perf_counter()
+                fresh = [p for p in self._pending if now - p.t_last <= self.deadline_s]
+                self.counts["dropped"] += len(self._pending) - len(fresh)
+                self._pending = fresh
+                if fresh:
+                    p = min(fresh, key=lambda q: (q.rank, q.t_first))
+                    self._pending.remove(p)
+                    self.current = p
+                    return p
+                if now >= end:
+                    return None
+                self._cv.wait(end - now)
+
+    def started(self, prompt: Prompt, extra_ms: float = 0.0) -> None:
+        """Audio for `prompt` began; `extra_ms` covers output buffering the backend knows about."""
+        self.latency_ms = (time.perf_counter() - prompt.t_first) * 1000.0 + extra_ms
+        self.counts["played"] += 1
+        if self.on_latency is not None:
+            self.on_latency(self.latency_ms)
+
+    def clear(self) -> None:
+        with self._cv:
+            self._pending.clear()
@@ -1,80 +1,39 @@
 from __future__ import annotations
-import os, threading, queue, time
-from typing import Tuple, List, Dict, Optional
+import threading, time
+from collections import deque
+from typing import Deque, Tuple, List, Optional
 
 import cv2
+import numpy as np
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 
-from detector import YoloDetector, SourceConfig
+from detector import YoloDetector, SourceConfig, pick_model_for_scope, models_for_scope
+from detections import Detections
+from pipeline import FramePacket, LatestSlot, UiChannel
+from metrics import Metrics, MetricsDumper, NullMetrics
+from display import DisplayPreparer
 from voice_manager import SpeechManager
 from mp3_manager import Mp3Manager
-from utils import now_ms, normalize_label, choose_priority_label
+from event_log import EventLog
+from feedback import FeedbackEngine
+from tracker import IouTracker
+from governor import FrameGovernor, INFER, TRACK
+from boxops import resolve_tl_conflicts
+from utils import now_ms
 from config import (
-    APP_NAME, APP_VERSION, DEFAULT_MODEL_PATH, DETECTION_MODEL_CANDIDATES,
-    FRAME_WIDTH, FRAME_HEIGHT, CONF_THRESHOLD, CLASS_THRESHOLDS, BASE_CONF_FOR_MODEL,
-    CLASS_COOLDOWNS_MS, CLASS_PRIORITY, LABELS_EN, LABELS_TL, VISUAL_BANNER,
+    APP_NAME, APP_VERSION, FRAME_WIDTH, FRAME_HEIGHT, LABELS_EN, LABELS_TL, VISUAL_BANNER,
     VOICE_MODE_DEFAULT, ESPEAKNG_RATE_WPM, ESPEAKNG_AMPLITUDE,
-    MP3_PATHS, MP3_REPEAT_GAP_MS, RECENT_LIMIT, RECENT_LOG_THROTTLE_MS, RECENT_HEADER,
-    CLASS_STABLE_FRAMES, STABLE_FRAMES, BG, CARD_BG, ACCENT,
+    MP3_PATHS, MP3_REPEAT_GAP_MS, RECENT_LIMIT, RECENT_LOG_THROTTLE_MS, RECENT_HEADER, EVENT_LOG_PATH,
+    BG, CARD_BG, ACCENT,
     DRAW_BOXES, DEBUG_LOG_DETECTIONS, BOX_THICKNESS, BOX_FONT_SCALE, BOX_FONT_TH,
-    LIVE_MAX_WIDTH, LIVE_MAX_HEIGHT, BANNER_TEXTS, MP3_REPEAT_COUNT,
-    MAX_VOICE_EVENTS_PER_CLASS, ALWAYS_UPDATE_BANNER_ON_DETECTION, FEEDBACK_STRICT_STABILITY
+    LIVE_MAX_WIDTH, LIVE_MAX_HEIGHT, PREVIEW_MAX_FPS, BANNER_TEXTS, MP3_REPEAT_COUNT,
+    ALWAYS_UPDATE_BANNER_ON_DETECTION,
+    RESOLVE_TL_CONFLICTS, TL_CONFLICT_IOU, TRACKER_ENABLED, GOVERNOR_ENABLED, CAPTURE_RETRY_MS,
+    METRICS_ENABLED, METRICS_OVERLAY, METRICS_OVERLAY_MS, METRICS_FILE
 )
 
-TL_SET = {"red", "yellow", "green"}
-
-def _iou(a, b):
-    ax1, ay1, ax2, ay2 = a
-    bx1, by1, bx2, by2 = b
-    inter_x1 = max(ax1, bx1); inter_y1 = max(ay1, by1)
-    inter_x2 = min(ax2, bx2); inter_y2 = min(ay2, by2)
-    iw = max(0, inter_x2 - inter_x1); ih = max(0, inter_y2 - inter_y1)
-    inter = iw * ih
-    if inter <= 0: return 0.0
-    area_a = max(0, (ax2-ax1)) * max(0, (ay2-ay1))
-    area_b = max(0, (bx2-bx1)) * max(0, (by2-by1))
-    union = area_a + area_b - inter
-    return inter / union if union > 0 else 0.0
-
-def nms_same_class(dets, iou_thr=0.5):
-    by_label = {}
-    for d in dets:
-        lab = d.get("label","")
-        by_label.setdefault(lab, []).append(d)
-    out = []
-    for lab, arr in by_label.items():
-        arr = sorted(arr, key=lambda x: float(x.get("conf", 0.0)), reverse=True)
-        kept = []
-        for d in arr:
-            bb = d.get("bbox",[0,0,0,0])
-            if not any(_iou(bb, k.get("bbox",[0,0,0,0])) > iou_thr for k in kept):
-                kept.append(d)
-        out.extend(kept)
-    return out
-
-def resolve_tl_conflicts(dets, iou_thr=0.5, conf_margin=0.08):
-    tls = [d for d in dets if d.get("label","") in TL_SET]
-    others = [d for d in dets if d.get("label","") not in TL_SET]
-    used = set()
-    clusters = []
-    for i, d in enumerate(tls):
-        if i in used: continue
-        cluster = [i]; used.add(i)
-        for j, e in enumerate(tls):
-            if j in used: continue
-            if _iou(d.get("bbox",[0,0,0,0]), e.get("bbox",[0,0,0,0])) > iou_thr:
-                cluster.append(j); used.add(j)
-        clusters.append(cluster)
-    resolved = []
-    for idxs in clusters:
-        group = [tls[k] for k in idxs]
-        group.sort(key=lambda x: float(x.get("conf",0.0)), reverse=True)
-        top = group[0]
-        resolved.append(top)
-    return others + resolved
-
 TEXT_OK = "#00ff9c"; TEXT_WARN = "#ffd166"; TEXT_STOP = "#ff4d4d"; TEXT_NORMAL = "#e6e6e6"
 
 class VisionAssistantApp:
@@ -86,19 +45,29 @@ class VisionAssistantApp:
 
         # Backends & state
         self.detector = YoloDetector()
-        self.video_thread = None  # type: Optional[threading.Thread]
+        self.video_threads: List[threading.Thread] = []
         self.video_running = False
-        self.info_q = queue.Queue()  # type: queue.Queue[Tuple[str, object]]
+        # capture -> inference -> feedback, each hand-off keeps only the newest frame
+        self.capture_slot = LatestSlot(maxlen=1)
+        self.result_slot = LatestSlot(maxlen=1)
+        self.metrics = Metrics() if METRICS_ENABLED else NullMetrics()
+        self.detector.metrics = self.metrics
+        self.last_announce_age_ms: Optional[float] = None
+        self.display = DisplayPreparer(max_fps=PREVIEW_MAX_FPS)
+        self._photo = None
+        self.info_q = UiChannel(recent_cap=RECENT_LIMIT)
 
         # UI state
         self.banner_text = tk.StringVar(value="")
-        self.recent_items: List[str] = []
+        self.recent_items: Deque[str] = deque(maxlen=RECENT_LIMIT)
+        self.event_log = EventLog(EVENT_LOG_PATH) if EVENT_LOG_PATH else None
         self.last_log_ms = 0
+        self._log_lock = threading.Lock()
 
         # Pacing state
-        self.per_class_last_ms: Dict[str, int] = {}
-        self.per_class_stable: Dict[str, int] = {}
-        self.voice_events_count: Dict[str, int] = {}
+        self.feedback = FeedbackEngine()
+        self.tracker = IouTracker() if TRACKER_ENABLED else None
+        self.governor = FrameGovernor(self.metrics) if GOVERNOR_ENABLED else None
 
         # Settings variables (Frame 1)
         self.var_lang = tk.StringVar(value="tl")
@@ -114,18 +83,26 @@ class VisionAssistantApp:
 
         # Voice backends
         self.speech = SpeechManager(rate_wpm=ESPEAKNG_RATE_WPM, amplitude=ESPEAKNG_AMPLITUDE)
+        self.speech.prerender({"en": LABELS_EN.values(), "tl": LABELS_TL.values()})
         self.mp3 = Mp3Manager(MP3_PATHS, repeat_gap_ms=MP3_REPEAT_GAP_MS)
-        # Hysteresis for traffic-light color switching
-        self._tl_last_label = None
-        self._tl_last_change_ms = 0
-        self._tl_hysteresis_ms = 1200
+        for backend in (self.speech, self.mp3):
+            backend.announcer.on_latency = lambda ms: self.metrics.add("audio_start", ms)
+        self.metrics_dumper = MetricsDumper(self.metrics, METRICS_FILE) if self.metrics.enabled and METRICS_FILE else None
+        self._watch_queues()
 
         # Build UI
         self._build_frame1()
         self._build_frame2()
         self._show(self.frame1)
         self._schedule_drain()
+        if self.metrics_dumper is not None:
+            self.metrics_dumper.start()
+        if self.metrics.enabled and METRICS_OVERLAY:
+            self._schedule_overlay()
         self._sync_language_to_backends()
+        # load the selected scope's model while the settings screen is open
+        self.var_detect.trace_add("write", lambda *_: self._preload_model())
+        self._preload_model()
 
     
     def _noop(self, *args, **kwargs): 
@@ -263,12 +240,17 @@ class VisionAssistantApp:
         self.video_area = tk.Frame(left, bg="#0b0c10", height=LIVE_MAX_HEIGHT, width=LIVE_MAX_WIDTH)
         self.video_area.pack(fill="both", expand=True)
         self.video_area.update_idletasks()
+        self.video_area.bind("<Configure>", lambda e: self.display.set_target(e.width, e.height))
         self.canvas = tk.Label(self.video_area, bg="#0b0c10")
         self.canvas.place(relx=0.5, rely=0.5, anchor="center")
 
         self.banner = tk.Label(left, textvariable=self.banner_text, bg="#0b1220", fg="white",
                                font=("Segoe UI", 12, "bold"), height=1, anchor="center")
         self.banner.pack(fill="x", pady=(8, 0))
+        self.overlay_text = tk.StringVar(value="")
+        if self.metrics.enabled and METRICS_OVERLAY:
+            tk.Label(left, textvariable=self.overlay_text, bg="#0b1220", fg="#9ca3af",
+                     font=("Consolas", 9), anchor="w").pack(fill="x")
 
         bottom = tk.Frame(left, bg=CARD_BG); bottom.pack(fill="x", pady=(12, 0))
         ttk.Button(bottom, text="Back", command=self._go_back).pack(side="left")
@@ -330,11 +312,11 @@ class VisionAssistantApp:
         frame.pack(fill="both", expand=True)
 
     def _pick_model_for_scope(self) -> str:
-        cand = DETECTION_MODEL_CANDIDATES.get(self.var_detect.get(), []) + [DEFAULT_MODEL_PATH]
-        for p in cand:
-            if os.path.exists(p):
-                return p
-        return DEFAULT_MODEL_PATH
+        return pick_model_for_scope(self.var_detect.get())
+
+    def _preload_model(self) -> None:
+        for path in models_for_scope(self.var_detect.get()).values():
+            self.detector.registry.preload(path)
 
     def _build_source_config(self) -> SourceConfig:
         if self.var_source_mode.get() == "camera":
@@ -353,7 +335,7 @@ class VisionAssistantApp:
         if self.video_running:
             return
         try:
-            self.detector.load(self._pick_model_for_scope())
+            self.detector.load_for_scope(self.var_detect.get())
         except Exception as e:
             messagebox.showerror(APP_NAME, "Failed to load model:\n{}".format(e))
             return
@@ -368,27 +350,42 @@ class VisionAssistantApp:
             self.recent_list.delete(0, tk.END)
         except Exception:
             pass
-        self.per_class_last_ms.clear(); self.per_class_stable.clear(); self.voice_events_count.clear()
+        for weights, backend in self.detector.backends.items():
+            self._log(f"model {weights}: {backend}", throttle=False)
+        cam = getattr(self.detector.cap, "info", None)
+        if cam:
+            self._log(f"camera: {cam['backend']} {cam['width']}x{cam['height']} @ {cam['fps']} fps, "
+                      f"{cam['fourcc'] or 'default format'}, buffer {cam['buffersize'] or 'driver default'}", throttle=False)
+        self.feedback.reset()
+        if self.tracker is not None:
+            self.tracker.reset()
+        if self.governor is not None:
+            self.governor.reset()
         self._show(self.frame2); self.btn_stop.configure(state="normal")
         try:
             self.btn_continue.configure(state="disabled")
         except Exception:
             pass
 
-        self.video_thread = threading.Thread(target=self._video_loop, daemon=True)
-        self.video_thread.start()
+        self.capture_slot.clear(); self.result_slot.clear(); self.metrics.clear()
+        self.last_announce_age_ms = None
+        self.video_threads = [threading.Thread(target=fn, daemon=True)
+                              for fn in (self._capture_loop, self._video_loop, self._feedback_loop)]
+        for t in self.video_threads:
+            t.start()
 
     def stop(self) -> None:
         if not self.video_running:
             return
         self.video_running = False
-        if self.video_thread and self.video_thread.is_alive():
-            self.video_thread.join(timeout=1.5)
+        for t in self.video_threads:
+            if t.is_alive():
+                t.join(timeout=1.5)
         try:
             self.detector.close()
         except Exception:
             pass
-        self.video_thread = None
+        self.video_threads = []
         self.banner_text.set("Stopped.")
         try:
             self.btn_stop.configure(state="disabled")
@@ -401,68 +398,83 @@ class VisionAssistantApp:
         except Exception: pass
         try: self.speech.stop(); self.mp3.stop()
         except Exception: pass
+        if self.event_log is not None:
+            self.event_log.close()
+        if self.metrics_dumper is not None:
+            self.metrics_dumper.stop()
         self.root.destroy()
 
+    # Metrics
+    def _watch_queues(self) -> None:
+        m = self.metrics
+        m.watch("capture_q", lambda: len(self.capture_slot))
+        m.watch("result_q", lambda: len(self.result_slot))
+        m.watch("speech_q", lambda: len(self.speech.announcer))
+        m.watch("mp3_q", lambda: len(self.mp3.announcer))
+        m.watch("capture_dropped", lambda: self.capture_slot.dropped)
+        m.watch("result_dropped", lambda: self.result_slot.dropped)
+        m.watch("image_dropped", lambda: self.info_q.images_dropped)
+        m.watch("prompts_dropped", lambda: self.speech.announcer.counts["dropped"] + self.mp3.announcer.counts["dropped"])
+
+    def _schedule_overlay(self) -> None:
+        if self.video_running:
+            self.overlay_text.set(self.metrics.overlay_text())
+        self.root.after(METRICS_OVERLAY_MS, self._schedule_overlay)
+
     # UI queue
     def _schedule_drain(self) -> None:
         self.root.after(60, self._drain_info_queue)
 
     def _drain_info_queue(self) -> None:
-        try:
-            while True:
-                typ, payload = self.info_q.get_nowait()
-                if typ == "image":
-                    self._set_canvas_image(payload)
-                elif typ == "banner":
-                    if isinstance(payload, tuple):
-                        txt, fg = payload
-                        self.banner_text.set(txt)
-                        try: self.banner.configure(fg=fg)
-                        except Exception: pass
-                    else:
-                        self.banner_text.set(payload)
-                elif typ == "recent":
-                    self._add_recent(payload)
-        except queue.Empty:
-            pass
+        recent: List[str] = []
+        for typ, payload in self.info_q.drain():
+            if typ == "image":
+                self._set_canvas_image(payload)
+            elif typ == "banner":
+                if isinstance(payload, tuple):
+                    txt, fg = payload
+                    self.banner_text.set(txt)
+                    try: self.banner.configure(fg=fg)
+                    except Exception: pass
+                else:
+                    self.banner_text.set(payload)
+            elif typ == "recent":
+                recent.append(payload)
+        if recent:
+            self._add_recent(recent)
         self._schedule_drain()
 
-    def _set_canvas_image(self, frame_bgr) -> None:
-        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        ih, iw = rgb.shape[:2]
-        img_ratio = iw / ih if ih else 1.0
-        try:
-            cw = max(1, int(self.video_area.winfo_width()))
-            ch = max(1, int(self.video_area.winfo_height()))
-        except Exception:
-            cw, ch = 960, 540
-        cont_ratio = cw / ch if ch else img_ratio
-        if img_ratio > cont_ratio:
-            tw = cw; th = int(cw / img_ratio)
-        else:
-            th = ch; tw = int(ch * img_ratio)
-        if tw < 1: tw = 1
-        if th < 1: th = 1
-        pil = Image.fromarray(rgb).resize((tw, th), Image.BILINEAR)
+    def _set_canvas_image(self, rgb) -> None:
+        # rgb is already sized for video_area by DisplayPreparer on the worker thread
+        pil = Image.fromarray(rgb)
+        if self._photo is not None and (self._photo.width(), self._photo.height()) == pil.size:
+            self._photo.paste(pil)
+            return
         self._photo = ImageTk.PhotoImage(image=pil)
         self.canvas.configure(image=self._photo)
         self.canvas.place(relx=0.5, rely=0.5, anchor='center')
 
     # Feedback sa voice & detections 
-    def _add_recent(self, text: str) -> None:
+    def _log(self, text: str, throttle: bool = True) -> None:
+        # any thread; stamped when it happened, shown on the next drain. Only the panel is throttled,
+        # the rolling log on disk gets every line
+        if self.event_log is not None:
+            self.event_log.write(text)
         now = now_ms()
-        if now - self.last_log_ms < RECENT_LOG_THROTTLE_MS:
-            return
-        self.last_log_ms = now
-        stamp = time.strftime("%H:%M:%S")
-        entry = f"[{stamp}] {text}"
-        self.recent_items.append(entry)
-        if len(self.recent_items) > RECENT_LIMIT:
-            self.recent_items = self.recent_items[-RECENT_LIMIT:]
+        with self._log_lock:
+            if throttle and now - self.last_log_ms < RECENT_LOG_THROTTLE_MS:
+                return
+            self.last_log_ms = now
+        self.info_q.put(("recent", f"[{time.strftime('%H:%M:%S')}] {text}"))
+
+    def _add_recent(self, entries: List[str]) -> None:
+        entries = entries[-RECENT_LIMIT:]
+        self.recent_items.extend(entries)
         try:
-            self.recent_list.delete(0, tk.END)
-            for it in self.recent_items:
-                self.recent_list.insert(tk.END, it)
+            self.recent_list.insert(tk.END, *entries)
+            extra = self.recent_list.size() - RECENT_LIMIT
+            if extra > 0:
+                self.recent_list.delete(0, extra - 1)
             self.recent_list.see(tk.END)
         except Exception:
             pass
@@ -475,116 +487,155 @@ class VisionAssistantApp:
         else: fg = TEXT_NORMAL
         self.info_q.put(('banner', (txt, fg)))
 
-    def _draw_boxes(self, frame, dets: List[Dict]) -> None:
-        try:
-            import cv2
-        except Exception:
-            return
+    def _draw_boxes(self, frame, dets: Detections) -> None:
         thickness = int(BOX_THICKNESS); fscale = float(BOX_FONT_SCALE); fth = int(BOX_FONT_TH)
         h, w = frame.shape[:2]
-        for d in dets:
+        if not len(dets):
+            return
+        xyxy = dets.xyxy.astype(np.int32)
+        np.clip(xyxy[:, 0::2], 0, w - 1, out=xyxy[:, 0::2]); np.clip(xyxy[:, 1::2], 0, h - 1, out=xyxy[:, 1::2])
+        for (x1, y1, x2, y2), conf, label in zip(xyxy.tolist(), dets.conf.tolist(), dets.labels):
             try:
-                x1, y1, x2, y2 = [int(v) for v in d.get('bbox', [0,0,0,0])]
-                x1 = max(0, min(w-1, x1)); x2 = max(0, min(w-1, x2))
-                y1 = max(0, min(h-1, y1)); y2 = max(0, min(h-1, y2))
                 if x2 <= x1 or y2 <= y1: continue
-                label = str(d.get('label', '')); conf = float(d.get('conf', 0.0))
                 txt = f'{label} {conf:.2f}'
                 cv2.rectangle(frame, (x1,y1), (x2,y2), (0,255,0), thickness)
                 cv2.putText(frame, txt, (x1, max(y1-6, 10)), cv2.FONT_HERSHEY_SIMPLEX, fscale, (0,255,0), fth, cv2.LINE_AA)
             except Exception:
                 continue
 
-    def _video_loop(self) -> None:
-        labels_map = LABELS_TL if self.var_lang.get() == "tl" else LABELS_EN
-        is_mp3 = (self.var_voice_mode.get() == "mp3")
+    # Pipeline stages
+    def _lossless(self) -> bool:
+        # a video read as fast as possible must not skip frames, so each stage waits for the next one
+        # instead of dropping; cameras and realtime playback drop the oldest frame
+        src = self.detector.source
+        return bool(src and src.mode == "video" and src.pacing == "fast")
+
+    def _hand_off(self, slot: LatestSlot, pkt: FramePacket, lossless: bool) -> None:
+        # when lossless the timeout only lets a stop request through; the frame is never dropped
+        while not slot.put(pkt, block=lossless, timeout=0.5) and self.video_running:
+            pass
+
+    def _capture_loop(self) -> None:
+        lossless = self._lossless()
+        seq = 0
+        retry_ms = CAPTURE_RETRY_MS[0]
         while self.video_running:
+            t0 = time.perf_counter()
             ok, frame = self.detector.read_frame()
             if not ok:
-                time.sleep(0.01)
+                time.sleep(retry_ms / 1000.0)
+                retry_ms = min(CAPTURE_RETRY_MS[1], retry_ms * 2)
                 continue
+            retry_ms = CAPTURE_RETRY_MS[0]
+            t1 = time.perf_counter()
+            self.metrics.add("capture", (t1 - t0) * 1000.0)
+            age_ms = getattr(self.detector.cap, "last_age_ms", 0.0)
+            if age_ms:
+                # the frame was grabbed before read() returned it; frame_age should count that too
+                self.metrics.add("camera_age", age_ms)
+                t1 -= age_ms / 1000.0
+            self.metrics.tick("capture")
+            seq += 1
+            self._hand_off(self.capture_slot, FramePacket(seq, frame, t1), lossless)
+        try:
+            self.detector.close()
+        except Exception:
+            pass
 
+    def _video_loop(self) -> None:
+        lossless = self._lossless()
+        while self.video_running:
+            pkt = self.capture_slot.get(timeout=0.1)
+            if pkt is None:
+                continue
+            self.metrics.add("queue_wait", pkt.age_ms())
+            t0 = time.perf_counter()
+            if self.governor is not None:
+                action = self.governor.decide(pkt.frame, can_track=self.tracker is not None)
+                self.metrics.add("governor", (time.perf_counter() - t0) * 1000.0)
+                if DEBUG_LOG_DETECTIONS and pkt.seq % 100 == 0:
+                    g = self.governor.stats()
+                    self._log(f"governor: infer {g['infer_share']:.0%} track {g['track_share']:.0%} "
+                              f"skip {g['skip_share']:.0%}, duty {g['duty']:.2f}")
+            elif self.tracker is not None:
+                action = INFER if self.tracker.should_detect() else TRACK
+            else:
+                action = INFER
+            if action != INFER:
+                self.metrics.count(action)
+                if action == TRACK:  # skipped frames never reach feedback or the preview
+                    pkt.dets = self.tracker.predict()
+                    self.metrics.add("tracking", (time.perf_counter() - t0) * 1000.0)
+                    self._hand_off(self.result_slot, pkt, lossless)
+                continue
+            self.metrics.count(INFER)
             try:
-                dets = self.detector.predict(frame)
+                pkt.dets = self.detector.predict(pkt.frame)
+                t1 = time.perf_counter()
+                if RESOLVE_TL_CONFLICTS:
+                    pkt.dets = resolve_tl_conflicts(pkt.dets, iou_thr=TL_CONFLICT_IOU)
             except Exception:
-                dets = []
+                pkt.dets = Detections.empty(self.detector.names)
+                t1 = time.perf_counter()
+                self.metrics.count("inference_errors")
+            if self.tracker is not None:
+                pkt.dets = self.tracker.update(pkt.dets)
+            t2 = time.perf_counter()
+            self.metrics.add("predict", (t1 - t0) * 1000.0)
+            self.metrics.add("postprocess", (t2 - t1) * 1000.0)
+            self.metrics.add("inference", (t2 - t0) * 1000.0)
+            self.metrics.tick("inference")
+            self._hand_off(self.result_slot, pkt, lossless)
+
+    def _feedback_loop(self) -> None:
+        labels_map = LABELS_TL if self.var_lang.get() == "tl" else LABELS_EN
+        is_mp3 = (self.var_voice_mode.get() == "mp3")
+        while self.video_running:
+            pkt = self.result_slot.get(timeout=0.1)
+            if pkt is None:
+                continue
+            t0 = time.perf_counter()
+            frame, dets = pkt.frame, pkt.dets
 
-            if DRAW_BOXES:
-                self._draw_boxes(frame, dets)
             if DEBUG_LOG_DETECTIONS and dets:
-                self.info_q.put(("recent", f"raw: {len(dets)} detections"))
-
-            present: List[str] = []
-            for d in dets:
-                label = normalize_label(d.get("label", ""))
-                conf = float(d.get("conf", 0.0))
-                thr = CLASS_THRESHOLDS.get(label, CONF_THRESHOLD)
-                if conf >= max(BASE_CONF_FOR_MODEL, thr):
-                    present.append(label)
-
-            winner = choose_priority_label(present)
-            if not winner:
-                s = set(present)
-                for p in CLASS_PRIORITY:
-                    if p in s:
-                        winner = p
-                        break
-          
-            if winner in TL_SET:
-                nowt_h = now_ms()
-                if self._tl_last_label and winner != self._tl_last_label:
-                    if (nowt_h - self._tl_last_change_ms) < self._tl_hysteresis_ms:
-                      
-                        winner = self._tl_last_label
-                    else:
-                        self._tl_last_label = winner
-                        self._tl_last_change_ms = nowt_h
-                elif self._tl_last_label is None:
-                    self._tl_last_label = winner
-                    self._tl_last_change_ms = nowt_h
-
+                self._log(f"raw: {len(dets)} detections")
+            if DEBUG_LOG_DETECTIONS and self.detector.tile_stats:
+                ts = self.detector.tile_stats
+                self._log(f"tiles: {ts['tiles']} in {ts['batches']} batch(es), {ts['total_ms']:.0f} ms")
 
+            winner, to_speak = self.feedback.update(dets)
             if ALWAYS_UPDATE_BANNER_ON_DETECTION and winner:
                 self._update_banner(winner)
 
-            to_speak = None
-            if winner:
-                req = CLASS_STABLE_FRAMES.get(winner, STABLE_FRAMES)
-                if not FEEDBACK_STRICT_STABILITY:
-                    req = 1
-                self.per_class_stable[winner] = self.per_class_stable.get(winner, 0) + 1
-                for k in list(self.per_class_stable.keys()):
-                    if k != winner:
-                        self.per_class_stable[k] = 0
-                if self.per_class_stable[winner] >= req:
-                    nowt = now_ms(); last = self.per_class_last_ms.get(winner, 0); cd = CLASS_COOLDOWNS_MS.get(winner, 6000)
-                    if (nowt - last) >= cd:
-                        cnt = self.voice_events_count.get(winner, 0)
-                        if MAX_VOICE_EVENTS_PER_CLASS < 0 or cnt < MAX_VOICE_EVENTS_PER_CLASS:
-                            to_speak = winner
-                            self.per_class_last_ms[winner] = nowt
-                            self.voice_events_count[winner] = cnt + 1
-
             if to_speak:
                 phrase = (LABELS_TL.get(to_speak, to_speak) if self.var_lang.get()=='tl' else LABELS_EN.get(to_speak, to_speak))
                 self._update_banner(to_speak)
                 if is_mp3 and self.mp3.available:
                     ok = self.mp3.play_label(to_speak, repeat=MP3_REPEAT_COUNT)
                     if not ok:
-                        self.speech.speak(phrase, times=2)
+                        self.speech.speak(phrase, times=2, label=to_speak)
                 else:
                     try:
-                        self.speech.speak(phrase, times=2)
+                        self.speech.speak(phrase, times=2, label=to_speak)
                     except Exception:
                         self.speech.say(phrase)
-                self.info_q.put(("recent", f"Detected: {to_speak.upper()}"))
-
-            self.info_q.put(("image", frame))
-
-        try:
-            self.detector.close()
-        except Exception:
-            pass
+                # how old the frame was when the prompt went out, capture to audio queue
+                self.last_announce_age_ms = pkt.age_ms()
+                self.metrics.add("announce_age", self.last_announce_age_ms)
+                self.metrics.count("announced")
+                self._log(f"Detected: {to_speak.upper()}")
+                if DEBUG_LOG_DETECTIONS:
+                    self._log(f"{to_speak} frame age: {self.last_announce_age_ms:.0f} ms")
+
+            if self.display.due():
+                if DRAW_BOXES:
+                    with self.metrics.timer("draw"):
+                        self._draw_boxes(frame, dets)
+                with self.metrics.timer("display"):
+                    self.info_q.put(("image", self.display.prepare(frame)))
+            self.metrics.add("feedback", (time.perf_counter() - t0) * 1000.0)
+            self.metrics.add("frame_age", pkt.age_ms())
+            self.metrics.tick("output")
 
 def main() -> None:
     app = VisionAssistantApp()
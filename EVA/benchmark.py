@@ -0,0 +1,186 @@
+from __future__ import annotations
+import argparse, time
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+import boxops
+from config import DEFAULT_MODEL_PATH, DETECTION_MODEL_CANDIDATES, TILE_SIZE
+from detector import OnnxYolo, YoloDetector
+
+
+def _read_clip(path: str, max_frames: int) -> List:
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while cap.isOpened() and len(frames) < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def _time_frames(frames: List, fn: Callable, warmup: int = 3) -> Dict[str, float]:
+    for f in frames[:warmup]:
+        fn(f)
+    n_dets = 0
+    t0 = time.perf_counter()
+    for f in frames:
+        n_dets += len(fn(f))
+    dt = time.perf_counter() - t0
+    n = max(1, len(frames))
+    return {"fps": n / dt if dt > 0 else 0.0, "ms": dt * 1000.0 / n, "dets": n_dets / n}
+
+def _print_rows(rows: List[tuple]) -> None:
+    print(f"{'mode':<22}{'fps':>8}{'ms/frame':>11}{'dets/frame':>12}")
+    for name, r in rows:
+        print(f"{name:<22}{r['fps']:>8.2f}{r['ms']:>11.1f}{r['dets']:>12.2f}")
+
+# tiling
+def bench_tiling(args) -> None:
+    frames = _read_clip(args.video, args.frames)
+    if not frames:
+        raise SystemExit(f"could not read frames from {args.video}")
+    det = YoloDetector()
+    det.load(args.model)
+
+    def legacy(frame):
+        # what the tiled path used to cost: a discarded full-frame pass on top of the tiles
+        det.model.predict(frame, imgsz=TILE_SIZE, verbose=False)
+        return det.predict(frame)
+
+    rows = []
+    det.tiling_enabled = False
+    rows.append(("full frame", _time_frames(frames, det.predict)))
+    det.tiling_enabled = True; det.tiling_global_fusion = False
+    rows.append(("tiles + wasted pass", _time_frames(frames, legacy)))
+    rows.append(("tiles", _time_frames(frames, det.predict)))
+    det.tiling_global_fusion = True
+    rows.append(("tiles + global fusion", _time_frames(frames, det.predict)))
+    print(f"{args.video}: {len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, model {args.model}")
+    _print_rows(rows)
+
+# nms: the pure-Python helpers boxops replaced, kept here as the baseline
+def _legacy_iou(a, b):
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    inter_x1 = max(ax1, bx1); inter_y1 = max(ay1, by1)
+    inter_x2 = min(ax2, bx2); inter_y2 = min(ay2, by2)
+    iw = max(0, inter_x2 - inter_x1); ih = max(0, inter_y2 - inter_y1)
+    inter = iw * ih
+    if inter <= 0: return 0.0
+    area_a = max(0, (ax2-ax1)) * max(0, (ay2-ay1))
+    area_b = max(0, (bx2-bx1)) * max(0, (by2-by1))
+    union = area_a + area_b - inter
+    return float(inter) / float(union) if union > 0 else 0.0
+
+def _legacy_nms_by_label(dets, iou_thr=0.5):
+    by_label = {}
+    for d in dets:
+        by_label.setdefault(d.get('label',''), []).append(d)
+    merged = []
+    for lab, arr in by_label.items():
+        arr = sorted(arr, key=lambda x: float(x.get('conf',0.0)), reverse=True)
+        keep = []
+        while arr:
+            top = arr.pop(0)
+            keep.append(top)
+            arr = [d for d in arr if _legacy_iou(top['bbox'], d['bbox']) < iou_thr]
+        merged.extend(keep)
+    return merged
+
+def _legacy_resolve_tl_conflicts(dets, iou_thr=0.5):
+    tls = [d for d in dets if d.get("label","") in boxops.TL_SET]
+    others = [d for d in dets if d.get("label","") not in boxops.TL_SET]
+    used = set()
+    clusters = []
+    for i, d in enumerate(tls):
+        if i in used: continue
+        cluster = [i]; used.add(i)
+        for j, e in enumerate(tls):
+            if j in used: continue
+            if _legacy_iou(d.get("bbox",[0,0,0,0]), e.get("bbox",[0,0,0,0])) > iou_thr:
+                cluster.append(j); used.add(j)
+        clusters.append(cluster)
+    resolved = []
+    for idxs in clusters:
+        group = sorted((tls[k] for k in idxs), key=lambda x: float(x.get("conf",0.0)), reverse=True)
+        resolved.append(group[0])
+    return others + resolved
+
+def _random_dets(n: int, seed: int = 0) -> List[Dict]:
+    # clustered boxes, like overlapping tiles at a low confidence threshold produce
+    rng = np.random.default_rng(seed)
+    labels = ["red", "yellow", "green", "stop", "yield", "no parking", "pedestrian crossing"]
+    centres = rng.uniform([0, 0], [1280, 720], size=(max(1, n // 8), 2))
+    c = centres[rng.integers(0, len(centres), n)] + rng.normal(0, 6, size=(n, 2))
+    wh = rng.uniform(20, 120, size=(n, 2))
+    boxes = np.hstack([c - wh / 2, c + wh / 2])
+    return [{"label": labels[int(k)], "conf": float(s), "bbox": b.tolist()}
+            for k, s, b in zip(rng.integers(0, len(labels), n), rng.uniform(0.05, 1.0, n), boxes)]
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+def bench_nms(args) -> None:
+    print(f"{'boxes':>6}{'nms legacy':>13}{'nms numpy':>12}{'tl legacy':>12}{'tl numpy':>11}   (ms, best of {args.repeat})")
+    for n in args.sizes:
+        dets = _random_dets(n)
+        r = [_best_of(lambda: _legacy_nms_by_label(dets, 0.5), args.repeat),
+             _best_of(lambda: boxops.nms_same_class(dets, 0.5), args.repeat),
+             _best_of(lambda: _legacy_resolve_tl_conflicts(dets, 0.5), args.repeat),
+             _best_of(lambda: boxops.resolve_tl_conflicts(dets, 0.5), args.repeat)]
+        print(f"{n:>6}{r[0]:>13.3f}{r[1]:>12.3f}{r[2]:>12.3f}{r[3]:>11.3f}")
+
+# onnx
+def bench_onnx(args) -> None:
+    frames = _read_clip(args.video, args.frames)
+    if not frames:
+        raise SystemExit(f"could not read frames from {args.video}")
+    rows = []
+    try:
+        from ultralytics import YOLO
+        yolo = YOLO(args.model, task="detect")
+        rows.append(("ultralytics", _time_frames(frames, lambda f: yolo.predict(f, imgsz=args.imgsz, conf=args.conf, verbose=False)[0])))
+    except ImportError:
+        print("ultralytics not installed, skipping its row")
+    for n in args.threads:
+        ort_model = OnnxYolo(args.model, intra_threads=n)
+        rows.append((f"onnxruntime x{n or 'auto'}", _time_frames(frames, lambda f: ort_model.predict(f, imgsz=args.imgsz, conf=args.conf)[0])))
+    print(f"{args.video}: {len(frames)} frames, model {args.model}, imgsz {args.imgsz}, conf {args.conf}")
+    _print_rows(rows)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Performance benchmarks for the vision assistant.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("tiling", help="FPS of full-frame vs tiled vs global+tiles inference on a recorded clip")
+    p.add_argument("--video", required=True)
+    p.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    p.add_argument("--frames", type=int, default=200)
+    p.set_defaults(func=bench_tiling)
+
+    p = sub.add_parser("nms", help="NumPy box ops vs the old pure-Python NMS / traffic-light conflict helpers")
+    p.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 300, 1000])
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_nms)
+
+    p = sub.add_parser("onnx", help="CPU latency of an .onnx model through ultralytics vs the native onnxruntime backend")
+    p.add_argument("--video", required=True)
+    p.add_argument("--model", default=(DETECTION_MODEL_CANDIDATES.get("traffic_lights") or [DEFAULT_MODEL_PATH])[0])
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--imgsz", type=int, default=640)
+    p.add_argument("--conf", type=float, default=0.25)
+    p.add_argument("--threads", type=int, nargs="+", default=[0], help="intra-op thread counts to try (0 = default)")
+    p.set_defaults(func=bench_onnx)
+
+    args = ap.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
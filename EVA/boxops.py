@@ -0,0 +1,87 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from detections import Detections
+from utils import TL_SET, normalize_label
+
+
+def as_boxes(boxes) -> np.ndarray:
+    return np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+
+def box_area(boxes: np.ndarray) -> np.ndarray:
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+def iou_matrix(a, b) -> np.ndarray:
+    """Pairwise IoU of (N, 4) and (M, 4) xyxy boxes -> (N, M)."""
+    a = as_boxes(a); b = as_boxes(b)
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    wh = np.clip(rb - lt, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+    union = box_area(a)[:, None] + box_area(b)[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+def nms(boxes, scores, iou_thr: float = 0.5) -> np.ndarray:
+    """Greedy NMS. Returns kept indices, highest score first."""
+    boxes = as_boxes(boxes); scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    if len(boxes) == 0:
+        return np.zeros((0,), dtype=np.int64)
+    order = np.argsort(-scores, kind="stable")
+    over = iou_matrix(boxes[order], boxes[order]) > iou_thr
+    suppressed = np.zeros(len(order), dtype=bool)
+    keep = []
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= over[i]
+    return order[np.asarray(keep, dtype=np.int64)]
+
+def batched_nms(boxes, scores, classes, iou_thr: float = 0.5) -> np.ndarray:
+    """Class-aware NMS: boxes of different classes never suppress each other. Returns kept indices."""
+    boxes = as_boxes(boxes); scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    if len(boxes) == 0:
+        return np.zeros((0,), dtype=np.int64)
+    _, cls_idx = np.unique(np.asarray(classes).reshape(-1), return_inverse=True)
+    keep = []
+    # one IoU matrix per class rather than one over every box
+    for c in range(int(cls_idx.max()) + 1):
+        idx = np.flatnonzero(cls_idx == c)
+        keep.append(idx[nms(boxes[idx], scores[idx], iou_thr)])
+    keep = np.concatenate(keep)
+    return keep[np.argsort(-scores[keep], kind="stable")]
+
+# Adapters for Detections and the list-of-dicts detection format
+def _dets_arrays(dets: List[Dict]):
+    boxes = as_boxes([d.get("bbox", [0, 0, 0, 0]) for d in dets])
+    scores = np.asarray([float(d.get("conf", 0.0)) for d in dets], dtype=np.float32)
+    return boxes, scores
+
+def nms_same_class(dets, iou_thr: float = 0.5):
+    if isinstance(dets, Detections):
+        return dets.select(batched_nms(dets.xyxy, dets.conf, dets.cls, iou_thr))
+    if not dets:
+        return []
+    boxes, scores = _dets_arrays(dets)
+    keep = batched_nms(boxes, scores, [d.get("label", "") for d in dets], iou_thr)
+    return [dets[i] for i in keep.tolist()]
+
+def resolve_tl_conflicts(dets, iou_thr: float = 0.5, tl_labels: Iterable[str] = TL_SET):
+    """Overlapping traffic-light boxes of different colours are one light: keep the most confident."""
+    tl_labels = set(tl_labels)
+    if isinstance(dets, Detections):
+        tl_ids = [c for c, n in dets.names.items() if normalize_label(n) in tl_labels]
+        is_tl = np.isin(dets.cls, tl_ids)
+        tl_idx = np.flatnonzero(is_tl)
+        keep = tl_idx[nms(dets.xyxy[tl_idx], dets.conf[tl_idx], iou_thr)]
+        return dets.select(np.concatenate([np.flatnonzero(~is_tl), keep]))
+    is_tl = [normalize_label(d.get("label", "")) in tl_labels for d in dets]
+    tls = [d for d, t in zip(dets, is_tl) if t]
+    others = [d for d, t in zip(dets, is_tl) if not t]
+    if not tls:
+        return others
+    boxes, scores = _dets_arrays(tls)
+    keep = nms(boxes, scores, iou_thr)
+    return others + [tls[i] for i in keep.tolist()]
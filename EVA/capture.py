@@ -0,0 +1,319 @@
+from __future__ import annotations
+import queue, sys, threading, time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import (CAMERA_BACKEND, CAMERA_FOURCC, CAMERA_FPS, CAMERA_BUFFER_SIZE, CAMERA_LATEST_ONLY,
+                    VIDEO_PREFETCH, VIDEO_PACING)
+
+_BACKENDS: Dict[str, int] = {
+    "v4l2": cv2.CAP_V4L2, "dshow": cv2.CAP_DSHOW, "msmf": cv2.CAP_MSMF,
+    "avfoundation": cv2.CAP_AVFOUNDATION, "gstreamer": cv2.CAP_GSTREAMER, "any": cv2.CAP_ANY,
+}
+
+
+def platform_backends(name: str = CAMERA_BACKEND) -> List[int]:
+    """Backends to try in order: the configured one, or the native one for this OS, then CAP_ANY."""
+    if name != "auto":
+        first = _BACKENDS.get(name.lower(), cv2.CAP_ANY)
+    elif sys.platform.startswith("linux"):
+        first = cv2.CAP_V4L2
+    elif sys.platform == "win32":
+        first = cv2.CAP_DSHOW
+    elif sys.platform == "darwin":
+        first = cv2.CAP_AVFOUNDATION
+    else:
+        first = cv2.CAP_ANY
+    return [first] if first == cv2.CAP_ANY else [first, cv2.CAP_ANY]
+
+def _fourcc_str(v: float) -> str:
+    v = int(v)
+    return "".join(chr((v >> 8 * i) & 0xFF) for i in range(4)).strip("\x00")
+
+
+class CameraCapture:
+    """A camera opened for low latency: explicit backend, requested pixel format, a one-frame
+    driver buffer, and optionally a grab thread that keeps only the newest frame.
+
+    Reads like cv2.VideoCapture (read/get/set/isOpened/release). `info` holds what the driver
+    actually negotiated and `last_age_ms` how long the frame returned by read() waited since it
+    was grabbed."""
+
+    def __init__(self, index: int, width: int, height: int, backend: str = CAMERA_BACKEND,
+                 fourcc: str = CAMERA_FOURCC, fps: float = CAMERA_FPS, buffer_size: int = CAMERA_BUFFER_SIZE,
+                 latest_only: bool = CAMERA_LATEST_ONLY) -> None:
+        self.index, self.width, self.height = int(index), int(width), int(height)
+        self.backend, self.fourcc, self.fps = backend, fourcc, float(fps)
+        self.buffer_size, self.latest_only = int(buffer_size), bool(latest_only)
+        self.cap: Optional[cv2.VideoCapture] = None
+        self.info: Dict[str, object] = {}
+        self.last_age_ms: float = 0.0
+        self._cond = threading.Condition()
+        self._latest: Optional[Tuple[int, np.ndarray, float]] = None  # (seq, frame, t_grab)
+        self._seq_read = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self) -> bool:
+        for api in platform_backends(self.backend):
+            cap = cv2.VideoCapture(self.index, api)
+            if cap.isOpened():
+                self.cap = cap
+                break
+            cap.release()
+        if self.cap is None:
+            return False
+        cap = self.cap
+        # V4L2 picks the mode from the format, so the fourcc goes in before the size
+        if self.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc[:4].ljust(4)))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps > 0:
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+        buf_ok = self.buffer_size > 0 and cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        self.info = {
+            "backend": cap.getBackendName() if hasattr(cap, "getBackendName") else "?",
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": round(float(cap.get(cv2.CAP_PROP_FPS)), 2), "fourcc": _fourcc_str(cap.get(cv2.CAP_PROP_FOURCC)),
+            "buffersize": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)) if buf_ok else None,
+            "latest_only": self.latest_only,
+        }
+        if self.latest_only:
+            self._running = True
+            self._thread = threading.Thread(target=self._grab_loop, daemon=True)
+            self._thread.start()
+        return True
+
+    def _grab_loop(self) -> None:
+        seq = 0
+        while self._running:
+            ok, frame = self.cap.read()
+            if not ok:
+                time.sleep(0.005)
+                continue
+            seq += 1
+            with self._cond:
+                self._latest = (seq, frame, time.perf_counter())
+                self._cond.notify_all()
+
+    def read(self, timeout: float = 1.0):
+        if self.cap is None:
+            return False, None
+        if not self.latest_only:
+            ok, frame = self.cap.read()
+            self.last_age_ms = 0.0
+            return ok, frame
+        with self._cond:
+            # a frame not handed out before, never one we already returned
+            if not self._cond.wait_for(lambda: self._latest is not None and self._latest[0] > self._seq_read, timeout):
+                return False, None
+            seq, frame, t_grab = self._latest
+        self._seq_read = seq
+        self.last_age_ms = (time.perf_counter() - t_grab) * 1000.0
+        return True, frame
+
+    def isOpened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def get(self, prop: int) -> float:
+        return self.cap.get(prop) if self.cap is not None else 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        return bool(self.cap.set(prop, value)) if self.cap is not None else False
+
+    def release(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class VideoFileReader:
+    """A video file decoded on a background thread into a bounded prefetch queue.
+
+    `stride` keeps every Nth frame and steps over the rest with grab(), so they are never
+    converted. "realtime" pacing hands frames out on the file's own clock and drops the ones a
+    slow consumer is already late for, like a camera would; "fast" hands them out as fast as
+    they are read. seek() is frame accurate. Reads like cv2.VideoCapture; get(CAP_PROP_POS_MSEC)
+    is the media time of the frame read() returned last."""
+
+    def __init__(self, path: str, stride: int = 1, loop: bool = False, pacing: str = VIDEO_PACING,
+                 prefetch: int = VIDEO_PREFETCH, start_ms: float = 0.0) -> None:
+        self.path = path
+        self.stride = max(1, int(stride))
+        self.loop = bool(loop)
+        self.realtime = pacing == "realtime"
+        self.cap: Optional[cv2.VideoCapture] = None
+        self.fps = 30.0
+        self.frame_count = 0
+        self.pos_ms = 0.0
+        self.pos_frame = -1
+        self.stats = {"decoded": 0, "skipped": 0, "dropped": 0}
+        self._q: "queue.Queue" = queue.Queue(maxsize=max(1, int(prefetch)))
+        self._lock = threading.Lock()
+        self._seek_to: Optional[int] = None
+        self._gen = 0               # bumped on seek so frames decoded before it are discarded
+        self._next_idx = 0          # index of the frame the next cap.read() decodes
+        self._wake = threading.Event()   # wakes the decoder parked at the end of the file
+        self._start_ms = float(start_ms)
+        self._anchor: Optional[Tuple[float, float]] = None   # (wall time, media ms) pacing reference
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self) -> bool:
+        cap = cv2.VideoCapture(self.path)
+        if not cap.isOpened():
+            return False
+        self.cap = cap
+        self.fps = float(cap.get(cv2.CAP_PROP_FPS)) or 30.0
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if self._start_ms > 0:
+            self._seek_to = int(round(self._start_ms * self.fps / 1000.0))
+        self._running = True
+        self._thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self._thread.start()
+        return True
+
+    def _seek_frames(self, target: int) -> None:
+        cap = self.cap
+        cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        pos = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if pos != target:
+            # the container could not land on it; decode forward from the start instead
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            pos = 0
+            while pos < target and cap.grab():
+                pos += 1
+        self._next_idx = pos
+
+    def _decode_loop(self) -> None:
+        cap = self.cap
+        while self._running:
+            with self._lock:
+                target, self._seek_to = self._seek_to, None
+                gen = self._gen
+                if target is not None:
+                    self._wake.clear()
+            if target is not None:
+                self._seek_frames(target)
+            idx = self._next_idx
+            ok, frame = cap.read()
+            if not ok:
+                if self.loop and idx > 0:
+                    self._seek_frames(0)
+                    continue
+                self._put((gen, None, idx))
+                # stay parked at the end so a later seek() still has a decoder to serve it
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            self.stats["decoded"] += 1
+            for _ in range(self.stride - 1):
+                if not cap.grab():
+                    break
+                self.stats["skipped"] += 1
+            self._next_idx = idx + self.stride
+            self._put((gen, frame, idx))
+
+    def _put(self, item) -> None:
+        while self._running:
+            try:
+                self._q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _next(self, timeout: float):
+        while True:
+            gen, frame, idx = self._q.get(timeout=timeout)
+            if gen == self._gen:
+                return frame, idx
+
+    def read(self, timeout: float = 2.0):
+        if self.cap is None:
+            return False, None
+        try:
+            frame, idx = self._next(timeout)
+        except queue.Empty:
+            return False, None
+        if frame is None:
+            return False, None
+        if self.realtime:
+            frame, idx = self._pace(frame, idx)
+        self.pos_frame = idx
+        self.pos_ms = idx * 1000.0 / self.fps
+        return True, frame
+
+    def _pace(self, frame, idx: int):
+        ms = idx * 1000.0 / self.fps
+        now = time.perf_counter()
+        if self._anchor is None or ms < self._anchor[1]:   # first frame, after a loop or a seek back
+            self._anchor = (now, ms)
+        due = self._anchor[0] + (ms - self._anchor[1]) / 1000.0
+        if now < due:
+            time.sleep(due - now)
+            return frame, idx
+        late_frames = (now - due) * self.fps / self.stride
+        # behind by more than a frame: skip to the newest already decoded frame, as a camera would
+        while late_frames >= 1.0 and not self._q.empty():
+            try:
+                nxt, nidx = self._next(0.0)
+            except queue.Empty:
+                break
+            if nxt is None:
+                self._q.put((self._gen, None, nidx))
+                break
+            frame, idx = nxt, nidx
+            self.stats["dropped"] += 1
+            late_frames -= 1.0
+        return frame, idx
+
+    def seek(self, ms: float) -> None:
+        """Next read() returns the frame at media time `ms`."""
+        with self._lock:
+            self._seek_to = max(0, int(round(ms * self.fps / 1000.0)))
+            self._gen += 1
+            self._anchor = None
+            self._wake.set()
+        while True:  # make room so the decoder is not stuck on a full queue of stale frames
+            try:
+                self._q.get_nowait()
+            except queue.Empty:
+                break
+
+    def isOpened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.pos_ms
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.pos_frame + 1)
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return self.cap.get(prop) if self.cap is not None else 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.seek(float(value) * 1000.0 / self.fps)
+            return True
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            self.seek(float(value))
+            return True
+        return False
+
+    def release(self) -> None:
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 APP_NAME: str = "EMBEDDED VISION ASSISTANT"
 APP_VERSION: str = "by alitaptap"
@@ -34,6 +34,36 @@ DETECTION_MODEL_CANDIDATES: Dict[str, List[str]] = {
     ],
 }
 
+# "both" scope: run the traffic-light and road-sign models together instead of one combined model
+MULTI_MODEL_ENABLED: bool  = False
+MULTI_MODEL_EVERY_N: Dict[str, int] = {
+    "traffic_lights": 1,   # every frame
+    "road_signs": 3,       # every 3rd frame, last result reused in between
+}
+MULTI_MODEL_PARALLEL: bool = True    # run due models on parallel workers
+MULTI_MODEL_IMGSZ: int     = 640     # shared letterboxed input size
+
+# ONNX inference
+# .onnx weights: "onnxruntime" runs them directly (OnnxYolo), "ultralytics" wraps them in YOLO()
+ONNX_BACKEND: str       = "onnxruntime"
+ONNX_INTRA_THREADS: int = 0       # threads inside one operator (0 = onnxruntime default: physical cores)
+ONNX_INTER_THREADS: int = 1       # threads across operators; the YOLO graph is sequential
+ONNX_IMGSZ: int         = 640     # input size for exports with a dynamic shape
+ONNX_NMS_IOU: float     = 0.70    # same as the ultralytics predict default
+ONNX_MAX_DET: int       = 300
+
+# .pt weights are exported once to a faster CPU format and the artifact is loaded instead
+EXPORT_ENABLED: bool      = True
+EXPORT_FORMATS: List[str] = ["openvino", "onnx", "ncnn"]   # first one whose toolchain is installed wins
+EXPORT_IMGSZ: int         = 640     # fixed input size baked into the export
+EXPORT_HALF: bool         = False
+EXPORT_DIR: Path          = MODELS_DIR / "exported"
+PREFER_INT8_MODELS: bool  = False   # load <weights>.int8.onnx from quantize.py instead when it exists
+
+# Loaded-model cache (model_registry.py)
+MODEL_CACHE_MAX_MODELS: int = 3
+MODEL_CACHE_MAX_MB: float   = 600.0   # estimated from weight file sizes
+MODEL_WARMUP: bool          = True    # run one dummy frame after loading
 
 FRAME_WIDTH: int  = 1280
 FRAME_HEIGHT: int = 720
@@ -132,6 +162,9 @@ BANNER_TEXTS = VISUAL_BANNER
 RECENT_LIMIT: int           = 30
 RECENT_LOG_THROTTLE_MS: int = 600
 RECENT_HEADER: str          = "Recent Detections"
+EVENT_LOG_PATH: Optional[str] = None   # rolling on-disk copy of the recent log, e.g. str(BASE_DIR / "logs" / "events.log")
+EVENT_LOG_MAX_MB: float       = 5.0
+EVENT_LOG_BACKUPS: int        = 3
 
 
 VOICE_MODE_DEFAULT: str = "ai"  # "ai" (espeak-ng) or "mp3"
@@ -140,6 +173,8 @@ VOICE_MODE_DEFAULT: str = "ai"  # "ai" (espeak-ng) or "mp3"
 MAX_VOICE_EVENTS_PER_CLASS: int   = -1   # -1 = unlimited
 ALWAYS_UPDATE_BANNER_ON_DETECTION: bool = True  
 FEEDBACK_STRICT_STABILITY: bool   = True 
+RESOLVE_TL_CONFLICTS: bool        = False  # overlapping red/yellow/green boxes -> keep the most confident
+TL_CONFLICT_IOU: float            = 0.50
 
 # eSpeak-NG
 ESPEAKNG_BIN: str       = "espeak-ng"
@@ -147,6 +182,9 @@ ESPEAKNG_VOICE_EN: str  = "en"
 ESPEAKNG_VOICE_TL: str  = "id"
 ESPEAKNG_RATE_WPM: int  = 185
 ESPEAKNG_AMPLITUDE: int = 140
+TTS_CACHE_ENABLED: bool  = True   # play pre-rendered WAVs instead of running espeak-ng per utterance
+TTS_CACHE_DIR: Path      = BASE_DIR / "cache" / "tts"
+TTS_CACHE_MAX_MB: float  = 50.0   # least recently played files are deleted above this
 
 # MP3
 MP3_PATHS = {
@@ -174,6 +212,8 @@ MP3_PATHS = {
 MP3_VOLUME: float         = 1.0
 MP3_REPEAT_COUNT: int     = 2
 MP3_REPEAT_GAP_MS: int    = 800 
+MIXER_FREQUENCY: int      = 22050  # shared by the MP3 prompts and cached speech
+MIXER_BUFFER: int         = 512    # samples; smaller starts sooner but may crackle on a busy CPU
 
 
 BG: str       = "#0b0f14"
@@ -188,6 +228,7 @@ BOX_FONT_TH: int     = 1
 
 LIVE_MAX_WIDTH: int  = 920
 LIVE_MAX_HEIGHT: int = 650
+PREVIEW_MAX_FPS: float = 15.0  # preview refresh cap, independent of detection FPS (0 = every frame)
 
 
 # SAHI tiling
@@ -196,3 +237,64 @@ TILE_SIZE: int         = 640
 TILE_OVERLAP: float    = 0.30
 TILING_MIN_WIDTH: int  = 960
 TILING_NMS_IOU: float  = 0.50
+TILING_BATCH_SIZE: int = 8     # max tiles per model call
+TILING_GLOBAL_FUSION: bool = False  # also run the whole frame and merge its boxes with the tiles
+
+# Region of interest: run inference (and tiling) only where lights and signs actually appear
+ROI_ENABLED: bool  = False
+ROI_STATIC: Dict[str, Tuple[float, float, float, float]] = {   # x1, y1, x2, y2 as fractions of the frame
+    "traffic_lights": (0.0, 0.0, 1.0, 0.60),
+    "road_signs": (0.30, 0.0, 1.0, 0.80),
+}
+ROI_LEARN: bool           = True       # replace ROI_STATIC with a box learned from detection centres
+ROI_GRID: Tuple[int, int] = (32, 18)   # heat-map cells (x, y)
+ROI_DECAY: float          = 0.995      # per update, so old drives fade out
+ROI_COVERAGE: float       = 0.98       # share of the heat the learned box must hold
+ROI_MARGIN: float         = 0.05       # added on each side, fraction of the frame
+ROI_MIN_SAMPLES: int      = 50         # detections needed before the learned box is used
+ROI_MERGE_IOU: float      = 0.30       # family crops overlapping this much are run as one
+ROI_FULL_FRAME_EVERY: int = 30         # full-frame pass every N frames (0 = never)
+
+# Tracker: run the detector on keyframes only and carry tracked boxes forward in between
+TRACKER_ENABLED: bool       = False
+TRACKER_DETECT_EVERY: int   = 3      # detector pass every N frames
+TRACKER_ADAPTIVE: bool      = True   # detect every frame while any track is still tentative
+TRACKER_CONFIDENT_HITS: int = 3      # matches before a track counts as confident
+TRACKER_IOU: float          = 0.30   # min IoU between a predicted track box and a detection
+TRACKER_MAX_MISSES: int     = 2      # detector passes a track may go unmatched before it is dropped
+TRACKER_ALPHA: float        = 0.6    # box gain of the alpha-beta filter
+TRACKER_BETA: float         = 0.1    # velocity gain
+
+# Frame-rate governor: pick infer / track-only / skip per frame to hold a latency target
+GOVERNOR_ENABLED: bool                = False
+GOVERNOR_TARGET_LATENCY_MS: float     = 150.0      # capture-to-feedback latency to stay under
+GOVERNOR_CPU_BUDGET: float            = 0.0        # max share of the frame interval spent in inference (0 = no cap)
+GOVERNOR_MOTION_SIZE: Tuple[int, int] = (64, 36)   # grey frame size for the motion score
+GOVERNOR_MOTION_LOW: float            = 0.01       # below: static view, detect half as often
+GOVERNOR_MOTION_HIGH: float           = 0.06       # above: moving view, detect twice as often
+GOVERNOR_MIN_DUTY: float              = 0.15       # never detect on fewer than this share of frames
+GOVERNOR_MAX_GAP: int                 = 10         # detector pass at least every N frames
+CAPTURE_RETRY_MS: Tuple[int, int]     = (10, 500)  # backoff after a failed read, first and max delay
+
+# Announcement scheduling (both voice backends)
+ANNOUNCE_DEADLINE_MS: int         = 3000           # queued prompts older than this are dropped
+ANNOUNCE_PREEMPT_LABELS: List[str] = ["red", "stop"]  # may cut off lower-priority audio that is playing
+
+# Profiling
+METRICS_ENABLED: bool        = False
+METRICS_WINDOW: int          = 300      # samples per stage kept for percentiles
+METRICS_OVERLAY: bool        = True     # p50/p95 and FPS line under the banner
+METRICS_OVERLAY_MS: int      = 1000
+METRICS_FILE: Optional[str]  = None     # JSON lines, e.g. str(BASE_DIR / "logs" / "metrics.jsonl")
+METRICS_DUMP_S: float        = 10.0
+
+# Camera capture
+CAMERA_BACKEND: str       = "auto"   # auto (per platform), v4l2, dshow, msmf, avfoundation, gstreamer, any
+CAMERA_FOURCC: str        = "MJPG"   # MJPG, YUYV or "" to leave the driver default
+CAMERA_FPS: float         = 30.0     # requested; 0 = driver default
+CAMERA_BUFFER_SIZE: int   = 1        # driver-side frame queue, where the backend supports it
+CAMERA_LATEST_ONLY: bool  = True     # grab thread keeps only the newest frame
+
+# Video files
+VIDEO_PREFETCH: int  = 8            # decoded frames buffered ahead of the reader
+VIDEO_PACING: str    = "realtime"   # "realtime" plays at the file's FPS like a camera, "fast" as fast as it is read
@@ -0,0 +1,94 @@
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+class Detections:
+    """Columnar detections of one frame: xyxy (N, 4), conf (N,), cls (N,) plus the model's names table.
+    `ids` holds track ids once the detections went through the tracker.
+
+    Filled with one host transfer per model result. Indexing or iterating yields the old
+    {"label", "conf", "bbox"} dicts, built only when asked for."""
+
+    __slots__ = ("xyxy", "conf", "cls", "names", "ids")
+
+    def __init__(self, xyxy, conf, cls, names: Optional[Dict[int, str]] = None, ids=None) -> None:
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        self.cls = np.asarray(cls, dtype=np.int64).reshape(-1)
+        self.names = names if names is not None else {}
+        self.ids = None if ids is None else np.asarray(ids, dtype=np.int64).reshape(-1)
+
+    @classmethod
+    def empty(cls, names: Optional[Dict[int, str]] = None) -> "Detections":
+        return cls(np.zeros((0, 4), np.float32), np.zeros((0,), np.float32), np.zeros((0,), np.int64), names)
+
+    @classmethod
+    def from_result(cls, result, names: Optional[Dict[int, str]] = None) -> "Detections":
+        """From an ultralytics Results object; boxes.data is copied to the host once.
+        Backends that already return Detections (OnnxYolo) pass straight through."""
+        if names is None:
+            names = getattr(result, "names", {}) or {}
+        if isinstance(result, Detections):
+            return cls(result.xyxy, result.conf, result.cls, names)
+        boxes = getattr(result, "boxes", None)
+        if boxes is None or len(boxes) == 0:
+            return cls.empty(names)
+        data = boxes.data.cpu().numpy()  # x1, y1, x2, y2, [track id,] conf, cls
+        return cls(data[:, :4], data[:, -2], data[:, -1], names)
+
+    @classmethod
+    def from_dicts(cls, dets: Sequence[Dict]) -> "Detections":
+        ids: Dict[str, int] = {}
+        for d in dets:
+            ids.setdefault(str(d.get("label", "")), len(ids))
+        names = {i: lab for lab, i in ids.items()}
+        return cls([d.get("bbox", [0, 0, 0, 0]) for d in dets], [float(d.get("conf", 0.0)) for d in dets],
+                    [ids[str(d.get("label", ""))] for d in dets], names)
+
+    @classmethod
+    def concat(cls, parts: Sequence["Detections"], names: Optional[Dict[int, str]] = None) -> "Detections":
+        """Parts must share one names table."""
+        if names is None:
+            names = parts[0].names if parts else {}
+        if not parts:
+            return cls.empty(names)
+        ids = np.concatenate([p.ids for p in parts]) if all(p.ids is not None for p in parts) else None
+        return cls(np.concatenate([p.xyxy for p in parts]), np.concatenate([p.conf for p in parts]),
+                   np.concatenate([p.cls for p in parts]), names, ids)
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def label(self, i: int) -> str:
+        c = int(self.cls[i])
+        return self.names.get(c, str(c))
+
+    @property
+    def labels(self) -> List[str]:
+        return [self.names.get(c, str(c)) for c in self.cls.tolist()]
+
+    def __getitem__(self, i: int) -> Dict:
+        d = {"label": self.label(i), "conf": float(self.conf[i]), "bbox": self.xyxy[i].tolist()}
+        if self.ids is not None:
+            d["track_id"] = int(self.ids[i])
+        return d
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_dicts(self) -> List[Dict]:
+        if self.ids is not None:
+            return list(self)
+        return [{"label": self.names.get(c, str(c)), "conf": s, "bbox": b}
+                for b, s, c in zip(self.xyxy.tolist(), self.conf.tolist(), self.cls.tolist())]
+
+    def select(self, idx) -> "Detections":
+        """Subset by index array or boolean mask."""
+        return Detections(self.xyxy[idx], self.conf[idx], self.cls[idx], self.names,
+                          None if self.ids is None else self.ids[idx])
+
+    def shifted(self, dx: float, dy: float) -> "Detections":
+        return Detections(self.xyxy + np.asarray([dx, dy, dx, dy], np.float32), self.conf, self.cls, self.names, self.ids)
@@ -1,38 +1,175 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
-from config import TILING_ENABLED, TILE_SIZE, TILE_OVERLAP, TILING_MIN_WIDTH, TILING_NMS_IOU
-import os
+from config import (BASE_CONF_FOR_MODEL, CLASS_THRESHOLDS, CONF_THRESHOLD, DEFAULT_MODEL_PATH, DETECTION_MODEL_CANDIDATES,
+                    TILING_ENABLED, TILE_SIZE, TILE_OVERLAP, TILING_MIN_WIDTH, TILING_NMS_IOU,
+                    TILING_BATCH_SIZE, TILING_GLOBAL_FUSION,
+                    MULTI_MODEL_ENABLED, MULTI_MODEL_EVERY_N, MULTI_MODEL_PARALLEL, MULTI_MODEL_IMGSZ,
+                    ROI_ENABLED, ROI_FULL_FRAME_EVERY,
+                    ONNX_INTRA_THREADS, ONNX_INTER_THREADS, ONNX_IMGSZ, ONNX_NMS_IOU, ONNX_MAX_DET,
+                    CAMERA_BACKEND, CAMERA_FOURCC, CAMERA_FPS, CAMERA_BUFFER_SIZE, CAMERA_LATEST_ONLY,
+                    VIDEO_PACING)
+import ast, os, time
 import cv2
+import numpy as np
+
+from boxops import batched_nms
+from capture import CameraCapture, VideoFileReader
+from detections import Detections
+from metrics import NullMetrics
+from model_registry import ModelRegistry, shared_registry
+from roi import RoiLearner, family_of
+from utils import TL_SET, normalize_label
 
 
 #SAHI tiling helpers
-    ax1, ay1, ax2, ay2 = a
-    bx1, by1, bx2, by2 = b
-    inter_x1 = max(ax1, bx1); inter_y1 = max(ay1, by1)
-    inter_x2 = min(ax2, bx2); inter_y2 = min(ay2, by2)
-    iw = max(0, inter_x2 - inter_x1); ih = max(0, inter_y2 - inter_y1)
-    inter = iw * ih
-    if inter <= 0: return 0.0
-    area_a = max(0, (ax2-ax1)) * max(0, (ay2-ay1))
-    area_b = max(0, (bx2-bx1)) * max(0, (by2-by1))
-    union = area_a + area_b - inter
-    return float(inter) / float(union) if union > 0 else 0.0
-
-def _nms_by_label(dets, iou_thr=0.5):
-    by_label = {}
-    for d in dets:
-        by_label.setdefault(d.get('label',''), []).append(d)
-    merged = []
-    for lab, arr in by_label.items():
-        arr = sorted(arr, key=lambda x: float(x.get('conf',0.0)), reverse=True)
-        keep = []
-        while arr:
-            top = arr.pop(0)
-            keep.append(top)
-            arr = [d for d in arr if _compute_iou(top['bbox'], d['bbox']) < iou_thr]
-        merged.extend(keep)
-    return merged
+def _tile_starts(length: int, tile: int, step: int) -> List[int]:
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, step))
+    starts.append(length - tile)  # last tile flush with the edge, so every tile is full size
+    return starts
+
+def _slice_tiles(frame, tile: int, overlap: float):
+    h, w = frame.shape[:2]
+    step = int(tile * (1.0 - float(overlap)))
+    if step <= 0: step = tile
+    tiles, origins = [], []
+    for y in _tile_starts(h, tile, step):
+        for x in _tile_starts(w, tile, step):
+            tiles.append(frame[y:y + tile, x:x + tile])
+            origins.append((x, y))
+    return tiles, np.asarray(origins, dtype=np.float32).reshape(-1, 2)
+
+def min_effective_conf(label: str) -> float:
+    # same rule the feedback engine applies, so nothing it would accept is cut at inference
+    return max(BASE_CONF_FOR_MODEL, CLASS_THRESHOLDS.get(label, CONF_THRESHOLD))
+
+def scope_filter(names: Dict[int, str], scope: str) -> Tuple[Optional[List[int]], float]:
+    """(class ids to keep or None for all, lowest threshold any kept class can pass) for a scope."""
+    labels = {c: normalize_label(n) for c, n in names.items()}
+    if scope == "traffic_lights":
+        wanted = [c for c, lab in labels.items() if lab in TL_SET]
+    elif scope == "road_signs":
+        wanted = [c for c, lab in labels.items() if lab not in TL_SET]
+    else:
+        wanted = list(labels)
+    if not labels:
+        return None, BASE_CONF_FOR_MODEL
+    # a filter that would keep every class is left to the model
+    classes = sorted(wanted) if len(wanted) < len(labels) else None
+    return classes, min((min_effective_conf(labels[c]) for c in wanted), default=BASE_CONF_FOR_MODEL)
+
+def pick_model_for_scope(scope: str) -> str:
+    cand = DETECTION_MODEL_CANDIDATES.get(scope, []) + [DEFAULT_MODEL_PATH]
+    for p in cand:
+        if os.path.exists(p):
+            return p
+    return DEFAULT_MODEL_PATH
+
+def models_for_scope(scope: str) -> Dict[str, str]:
+    """Weights to load for a scope. With MULTI_MODEL_ENABLED, "both" uses the two specialised models
+    when they resolve to different files."""
+    if scope == "both" and MULTI_MODEL_ENABLED:
+        paths = {s: pick_model_for_scope(s) for s in ("traffic_lights", "road_signs")}
+        if len(set(paths.values())) > 1:
+            return paths
+    return {scope: pick_model_for_scope(scope)}
+
+def letterbox(img, size: int, out: Optional[np.ndarray] = None):
+    """Resize into a size x size canvas keeping aspect ratio. Returns (canvas, scale, (pad_x, pad_y))."""
+    h, w = img.shape[:2]
+    r = min(size / h, size / w)
+    nw, nh = int(round(w * r)), int(round(h * r))
+    px, py = (size - nw) // 2, (size - nh) // 2
+    if out is None or out.shape[:2] != (size, size):
+        out = np.empty((size, size, 3), np.uint8)
+    out[:] = 114
+    out[py:py + nh, px:px + nw] = cv2.resize(img, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return out, r, (px, py)
+
+class OnnxYolo:
+    """A YOLOv8 detection export run on ONNX Runtime without ultralytics.
+
+    Same predict() call as ultralytics.YOLO, but each result is a Detections. Every image is
+    letterboxed with cv2 into one preallocated canvas and written into one preallocated NCHW
+    input tensor; the (4 + classes, anchors) head is decoded and NMS'd in NumPy."""
+
+    def __init__(self, path: str, intra_threads: int = ONNX_INTRA_THREADS, inter_threads: int = ONNX_INTER_THREADS,
+                 iou: float = ONNX_NMS_IOU, max_det: int = ONNX_MAX_DET) -> None:
+        import onnxruntime as ort
+        so = ort.SessionOptions()
+        if intra_threads > 0:
+            so.intra_op_num_threads = int(intra_threads)
+        if inter_threads > 0:
+            so.inter_op_num_threads = int(inter_threads)
+        so.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, so, providers=["CPUExecutionProvider"])
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        # exports with a fixed input size ignore imgsz; dynamic ones follow it
+        self.fixed_size = inp.shape[2] if isinstance(inp.shape[2], int) else None
+        self.dtype = np.float16 if inp.type == "tensor(float16)" else np.float32
+        self.iou = float(iou)
+        self.max_det = int(max_det)
+        meta = self.session.get_modelmeta().custom_metadata_map
+        try:
+            names = ast.literal_eval(meta.get("names", "{}"))
+        except (ValueError, SyntaxError):
+            names = {}
+        self.names: Dict[int, str] = {int(k): str(v) for k, v in dict(names).items()}
+        self._canvas: Optional[np.ndarray] = None
+        self._input: Optional[np.ndarray] = None
+
+    def _buffers(self, size: int) -> None:
+        if self._input is None or self._input.shape[2] != size:
+            self._canvas = np.empty((size, size, 3), np.uint8)
+            self._input = np.empty((1, 3, size, size), self.dtype)
+
+    def predict(self, source, imgsz: Optional[int] = None, conf: Optional[float] = None,
+                classes: Optional[List[int]] = None, verbose: bool = False, **_) -> List[Detections]:
+        size = self.fixed_size or int(imgsz or ONNX_IMGSZ)
+        self._buffers(size)
+        images = source if isinstance(source, (list, tuple)) else [source]
+        return [self._run(img, size, 0.25 if conf is None else float(conf), classes) for img in images]
+
+    def _run(self, img, size: int, conf: float, classes: Optional[List[int]]) -> Detections:
+        canvas, r, (px, py) = letterbox(img, size, out=self._canvas)
+        # BGR HWC uint8 -> RGB CHW in [0, 1], straight into the input tensor
+        np.multiply(canvas[..., ::-1].transpose(2, 0, 1), 1.0 / 255.0, out=self._input[0], casting="unsafe")
+        pred = self.session.run(None, {self.input_name: self._input})[0][0]  # (4 + nc, anchors)
+        scores = pred[4:]
+        cls = scores.argmax(0)
+        best = scores[cls, np.arange(scores.shape[1])]
+        keep = best >= conf
+        if classes is not None:
+            keep &= np.isin(cls, classes)
+        if not keep.any():
+            return Detections.empty(self.names)
+        cxcy, wh, cls, best = pred[:2, keep].T, pred[2:4, keep].T, cls[keep], best[keep]
+        boxes = np.hstack([cxcy - wh / 2, cxcy + wh / 2]).astype(np.float32)
+        idx = batched_nms(boxes, best, cls, self.iou)[:self.max_det]
+        boxes = boxes[idx]
+        boxes -= np.asarray([px, py, px, py], np.float32)
+        boxes /= r
+        h, w = img.shape[:2]
+        np.clip(boxes, 0, [w, h, w, h], out=boxes)
+        return Detections(boxes, best[idx], cls[idx], self.names)
+
+@dataclass
+class _Member:
+    """One model of the multi-model mode."""
+    scope: str
+    model: object
+    remap: np.ndarray                 # model class id -> merged class id
+    every_n: int
+    classes: Optional[List[int]]
+    min_conf: float
+    last: Optional[Detections] = None
+    ms: float = 0.0
+
 @dataclass
 class SourceConfig:
     mode: str
@@ -41,33 +178,117 @@ class SourceConfig:
     height: int = 720
     video_path: Optional[str] = None
     loop_video: bool = False
+    backend: str = CAMERA_BACKEND
+    fourcc: str = CAMERA_FOURCC
+    fps: float = CAMERA_FPS
+    buffer_size: int = CAMERA_BUFFER_SIZE
+    latest_only: bool = CAMERA_LATEST_ONLY
+    stride: int = 1                 # video: keep every Nth frame
+    pacing: str = VIDEO_PACING      # video: "realtime" or "fast"
+    start_ms: float = 0.0           # video: where to start
 
 class YoloDetector:
-    def __init__(self) -> None:
+    def __init__(self, registry: Optional[ModelRegistry] = None) -> None:
+        self.registry = registry or shared_registry
         self.model = None
         self.cap = None  # type: Optional[cv2.VideoCapture]
         self.source = None  # type: Optional[SourceConfig]
+        self.names: Dict[int, str] = {}
+        self.tiling_enabled: bool = TILING_ENABLED
+        self.tiling_global_fusion: bool = TILING_GLOBAL_FUSION
+        # pushed into the model call: lowest threshold any wanted class can pass, and the wanted class ids
+        self.scope: str = "both"
+        self.min_conf: Optional[float] = None
+        self.classes: Optional[List[int]] = None
+        self.tile_stats: Dict[str, object] = {}
+        # region of interest: crops learned from where each class family appears
+        self.roi_enabled: bool = ROI_ENABLED
+        self.roi = RoiLearner()
+        self.roi_stats: Dict[str, object] = {}
+        self._roi_frames = 0
+        self._family_ids: Dict[str, np.ndarray] = {}
+        # multi-model mode: several specialised models on one shared input
+        self.members: List[_Member] = []
+        self.multi_stats: Dict[str, object] = {}
+        self.metrics = NullMetrics()  # the app hands in its Metrics
+        self.backends: Dict[str, str] = {}  # weights -> "backend (why)" of what is loaded
+        self._frame_idx = 0
+        self._lb_buf: Optional[np.ndarray] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
 
     def load(self, model_path: str) -> None:
-        from ultralytics import YOLO
-        self.model = YOLO(model_path)
+        # Stop/Continue and Back/Start with the same scope hit the registry instead of re-reading weights
+        entry = self.registry.get(model_path)
+        self.model = entry.model
+        self.names = dict(entry.names)
+        self.backends = {os.path.basename(entry.path): f"{entry.backend} ({entry.reason})"}
+        self.members = []
+        self._resolve_filter()
+
+    def load_multi(self, paths: Dict[str, str]) -> None:
+        """Run one model per scope on every frame, e.g. {"traffic_lights": ..., "road_signs": ...}."""
+        merged: Dict[str, int] = {}
+        names: Dict[int, str] = {}
+        members: List[_Member] = []
+        self.backends = {}
+        for scope, path in paths.items():
+            entry = self.registry.get(path)
+            self.backends[os.path.basename(entry.path)] = f"{entry.backend} ({entry.reason})"
+            remap = np.zeros((max(entry.names, default=-1) + 1,), np.int64)
+            for c, n in entry.names.items():
+                key = normalize_label(n)
+                if key not in merged:
+                    merged[key] = len(merged); names[merged[key]] = n
+                remap[c] = merged[key]
+            classes, min_conf = scope_filter(entry.names, scope)
+            members.append(_Member(scope, entry.model, remap, max(1, int(MULTI_MODEL_EVERY_N.get(scope, 1))),
+                                   classes, min_conf))
+        self.model = members[0].model if members else None
+        self.names = names
+        self.members = members
+        self.scope = "both"
+        self.classes, self.min_conf = None, None
+        self._frame_idx = 0
+
+    def load_for_scope(self, scope: str) -> None:
+        paths = models_for_scope(scope)
+        if len(paths) > 1:
+            self.load_multi(paths)
+        else:
+            self.load(next(iter(paths.values())))
+            self.set_scope(scope)
+
+    def set_scope(self, scope: str) -> None:
+        self.scope = scope or "both"
+        self._resolve_filter()
+
+    def _resolve_filter(self) -> None:
+        if not self.members:
+            self.classes, self.min_conf = scope_filter(self.names, self.scope)
+        fams: Dict[str, List[int]] = {}
+        for c, n in self.names.items():
+            fams.setdefault(family_of(n), []).append(c)
+        self._family_ids = {f: np.asarray(ids, np.int64) for f, ids in fams.items()}
+
+    def _names_from(self, result) -> None:
+        if not self.names:
+            self.names = dict(getattr(result, "names", {}) or {})
+            self._resolve_filter()
 
     def open_source(self, source: SourceConfig) -> bool:
         self.source = source
         if source.mode == "camera":
-            cap = cv2.VideoCapture(source.cam_index, cv2.CAP_DSHOW)
-            if not cap.isOpened():
-                cap = cv2.VideoCapture(source.cam_index)
-            if not cap.isOpened():
+            cap = CameraCapture(source.cam_index, source.width, source.height, source.backend, source.fourcc,
+                                source.fps, source.buffer_size, source.latest_only)
+            if not cap.open():
                 return False
-            cap.set(cv2.CAP_PROP_FRAME_WIDTH, source.width)
-            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, source.height)
             self.cap = cap
             return True
         if not source.video_path or not os.path.exists(source.video_path):
             return False
-        cap = cv2.VideoCapture(source.video_path)
-        if not cap.isOpened():
+        cap = VideoFileReader(source.video_path, source.stride, source.loop_video, source.pacing,
+                              start_ms=source.start_ms)
+        if not cap.open():
             return False
         self.cap = cap
         return True
@@ -75,62 +296,122 @@ class YoloDetector:
     def read_frame(self):
         if self.cap is None:
             return False, None
-        ret, frame = self.cap.read()
-        if not ret and self.source and self.source.mode == "video" and self.source.loop_video:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, frame = self.cap.read()
-        return ret, frame
+        return self.cap.read()
+
+    def _run_member(self, m: _Member, img, scale: float, pad: Tuple[int, int]) -> None:
+        t0 = time.perf_counter()
+        size = img.shape[0]
+        r = m.model.predict(img, imgsz=size, conf=m.min_conf, classes=m.classes, verbose=False)[0]
+        d = Detections.from_result(r, self.names)
+        # back from the shared letterboxed input to frame coordinates, and onto the merged class ids
+        d.xyxy -= np.asarray([pad[0], pad[1], pad[0], pad[1]], np.float32)
+        d.xyxy /= scale
+        d.cls = m.remap[d.cls] if len(d) else d.cls
+        m.last = d
+        m.ms = (time.perf_counter() - t0) * 1000.0
+        self.metrics.add(f"model_{m.scope}", m.ms)
 
-    def predict(self, frame) -> List[Dict]:
+    def _predict_multi(self, frame) -> Detections:
+        img, scale, pad = letterbox(frame, MULTI_MODEL_IMGSZ, out=self._lb_buf)
+        self._lb_buf = img
+        due = [m for m in self.members if m.last is None or self._frame_idx % m.every_n == 0]
+        self._frame_idx += 1
+        if MULTI_MODEL_PARALLEL and len(due) > 1:
+            if self._pool is None:  # created on first use, so close() can shut it down between runs
+                self._pool = ThreadPoolExecutor(max_workers=len(self.members), thread_name_prefix="yolo")
+            for f in [self._pool.submit(self._run_member, m, img, scale, pad) for m in due]:
+                f.result()
+        else:
+            for m in due:
+                self._run_member(m, img, scale, pad)
+        self.multi_stats = {"ran": [m.scope for m in due], "ms": {m.scope: m.ms for m in self.members}}
+        # models not due this frame contribute their last result
+        return Detections.concat([m.last for m in self.members], self.names)
+
+    def _roi_regions(self, frame):
+        """[((x1, y1, x2, y2), class ids to keep or None)] to run this frame, or None for the whole frame."""
+        if not self.roi_enabled:
+            return None
+        self._roi_frames += 1
+        # a periodic full-frame pass keeps the heat map honest about what lies outside the ROI
+        if ROI_FULL_FRAME_EVERY > 0 and (self._roi_frames - 1) % ROI_FULL_FRAME_EVERY == 0:
+            return None
+        fams = [self.scope] if self.scope in self._family_ids else list(self._family_ids)
+        if not fams:
+            return None
+        return [(box, None if served is None or len(fams) == 1 else self._family_ids[served[0]])
+                for box, served in self.roi.regions(fams, frame.shape)]
+
+    def predict(self, frame) -> Detections:
+        if self.members:
+            return self._predict_multi(frame)
         if self.model is None:
-            return []
+            return Detections.empty(self.names)
         h, w = frame.shape[:2]
-        use_tiling = bool(TILING_ENABLED and w >= TILING_MIN_WIDTH and TILE_SIZE > 0 and 0.0 <= TILE_OVERLAP < 0.5)
-        if not use_tiling:
-            results = self.model.predict(frame, verbose=False)
-            r0 = results[0]
-            names = r0.names if hasattr(r0, "names") else {}
-            out: List[Dict] = []
-            if getattr(r0, "boxes", None) is not None:
-                for b in r0.boxes:
-                    try:
-                        cls_id = int(b.cls[0].item()); conf = float(b.conf[0].item()); xyxy = b.xyxy[0].tolist()
-                    except Exception:
-                        cls_id = int(b.cls.item()); conf = float(b.conf.item()); xyxy = list(b.xyxy.view(-1).tolist())
-                    label = names.get(cls_id, str(cls_id))
-                    out.append({"label": label, "conf": conf, "bbox": xyxy})
-            return out
-
-        step = int(TILE_SIZE * (1.0 - float(TILE_OVERLAP)))
-        if step <= 0: step = TILE_SIZE
-        dets_all: List[Dict] = []
-        results0 = self.model.predict(frame, imgsz=TILE_SIZE, verbose=False)
-        names = results0[0].names if hasattr(results0[0], "names") else {}
-        y = 0
-        while y < h:
-            x = 0
-            y2 = min(h, y + TILE_SIZE)
-            while x < w:
-                x2 = min(w, x + TILE_SIZE)
-                tile = frame[y:y2, x:x2]
-                results = self.model.predict(tile, imgsz=TILE_SIZE, verbose=False)
-                r = results[0]
-                if getattr(r, "boxes", None) is not None:
-                    for b in r.boxes:
-                        try:
-                            cls_id = int(b.cls[0].item()); conf = float(b.conf[0].item()); xyxy = b.xyxy[0].tolist()
-                        except Exception:
-                            cls_id = int(b.cls.item()); conf = float(b.conf.item()); xyxy = list(b.xyxy.view(-1).tolist())
-                        x1, y1, x2b, y2b = xyxy
-                        ox1 = float(x1 + x); oy1 = float(y1 + y); ox2 = float(x2b + x); oy2 = float(y2b + y)
-                        label = names.get(cls_id, str(cls_id))
-                        dets_all.append({"label": label, "conf": conf, "bbox": [ox1, oy1, ox2, oy2]})
-                x += step
-            y += step
-        merged = _nms_by_label(dets_all, iou_thr=float(TILING_NMS_IOU))
-        return merged
-
-        return out
+        use_tiling = bool(self.tiling_enabled and w >= TILING_MIN_WIDTH and TILE_SIZE > 0 and 0.0 <= TILE_OVERLAP < 0.5)
+        regions = self._roi_regions(frame)
+        if regions is None and not use_tiling:
+            self.tile_stats = {}; self.roi_stats = {}
+            with self.metrics.timer("model"):
+                results = self.model.predict(frame, conf=self.min_conf, classes=self.classes, verbose=False)
+            self._names_from(results[0])
+            dets = Detections.from_result(results[0], self.names)
+            if self.roi_enabled:
+                self.roi.add(dets.xyxy, dets.labels, frame.shape)
+            return dets
+
+        if regions is None:
+            regions = [((0, 0, w, h), None)]
+        t_slice = time.perf_counter()
+        images, origins, keeps = [], [], []
+        for (x1, y1, x2, y2), keep in regions:
+            sub = frame[y1:y2, x1:x2]
+            if use_tiling:
+                # inside an ROI only the ROI is tiled
+                tiles, offs = _slice_tiles(sub, TILE_SIZE, TILE_OVERLAP)
+            else:
+                tiles, offs = [sub], np.zeros((1, 2), np.float32)
+            images.extend(tiles); keeps.extend([keep] * len(tiles))
+            origins.append(offs + np.asarray([x1, y1], np.float32))
+        n_tiles = len(images)
+        if use_tiling and self.tiling_global_fusion:
+            # whole frame rides along in the tile batch; its boxes are merged with the tiles' in NMS
+            images.append(frame); keeps.append(None)
+            origins.append(np.zeros((1, 2), np.float32))
+        origins = np.vstack(origins)
+        self.metrics.add("slice", (time.perf_counter() - t_slice) * 1000.0)
+        bs = max(1, int(TILING_BATCH_SIZE)) if use_tiling else len(images)
+        size_kw = {"imgsz": TILE_SIZE} if use_tiling else {}
+        parts: List[Detections] = []
+        batch_ms: List[float] = []
+        for i in range(0, len(images), bs):
+            t0 = time.perf_counter()
+            results = self.model.predict(images[i:i + bs], conf=self.min_conf, classes=self.classes,
+                                         verbose=False, **size_kw)
+            batch_ms.append((time.perf_counter() - t0) * 1000.0)
+            self.metrics.add("model", batch_ms[-1])
+            self._names_from(results[0])
+            parts.extend(Detections.from_result(r, self.names) for r in results)
+        # a crop serving one family only reports that family's classes
+        parts = [p if k is None else p.select(np.isin(p.cls, k)) for p, k in zip(parts, keeps)]
+        if use_tiling:
+            self.tile_stats = {"tiles": n_tiles, "global": self.tiling_global_fusion, "batches": len(batch_ms),
+                               "batch_ms": batch_ms, "total_ms": float(sum(batch_ms))}
+        else:
+            self.tile_stats = {}
+        area = sum((x2 - x1) * (y2 - y1) for (x1, y1, x2, y2), _ in regions)
+        self.roi_stats = {"regions": [box for box, _ in regions], "pixel_frac": area / float(w * h)} if self.roi_enabled else {}
+        dets = Detections.concat(parts, self.names)
+        if len(dets):
+            # shift every box by the origin of the tile or crop it came from in one step
+            offs = np.repeat(origins, [len(p) for p in parts], axis=0)
+            dets.xyxy += np.tile(offs, 2)
+            if len(images) > 1:
+                with self.metrics.timer("merge_nms"):
+                    dets = dets.select(batched_nms(dets.xyxy, dets.conf, dets.cls, float(TILING_NMS_IOU)))
+        if self.roi_enabled:
+            self.roi.add(dets.xyxy, dets.labels, frame.shape)
+        return dets
 
     def close(self) -> None:
         if self.cap is not None:
@@ -139,3 +420,6 @@ class YoloDetector:
             except Exception:
                 pass
         self.cap = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
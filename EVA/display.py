@@ -0,0 +1,56 @@
+from __future__ import annotations
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def fit_size(iw: int, ih: int, cw: int, ch: int) -> Tuple[int, int]:
+    img_ratio = iw / ih if ih else 1.0
+    cont_ratio = cw / ch if ch else img_ratio
+    if img_ratio > cont_ratio:
+        tw = cw; th = int(cw / img_ratio)
+    else:
+        th = ch; tw = int(ch * img_ratio)
+    return max(1, tw), max(1, th)
+
+
+class DisplayPreparer:
+    """Resizes frames to the preview area and converts them to RGB on the worker thread.
+
+    Output goes into a small ring of preallocated buffers, so the Tk thread can still be
+    reading the previous image while the next one is written."""
+
+    def __init__(self, max_fps: float = 0.0, n_buffers: int = 3) -> None:
+        self.target: Tuple[int, int] = (960, 540)
+        self.min_interval = (1.0 / float(max_fps)) if max_fps and max_fps > 0 else 0.0
+        self._ring: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * max(2, int(n_buffers))
+        self._idx = 0
+        self._last_t = 0.0
+
+    def set_target(self, width: int, height: int) -> None:
+        # called from the Tk thread on <Configure>; a tuple swap is atomic
+        self.target = (max(1, int(width)), max(1, int(height)))
+
+    def due(self) -> bool:
+        """True when a preview frame should be produced now (PREVIEW_MAX_FPS cap)."""
+        now = time.perf_counter()
+        if self.min_interval and (now - self._last_t) < self.min_interval:
+            return False
+        self._last_t = now
+        return True
+
+    def prepare(self, frame_bgr) -> np.ndarray:
+        ih, iw = frame_bgr.shape[:2]
+        tw, th = fit_size(iw, ih, *self.target)
+        self._idx = (self._idx + 1) % len(self._ring)
+        bufs = self._ring[self._idx]
+        if bufs is None or bufs[0].shape[:2] != (th, tw):
+            bufs = (np.empty((th, tw, 3), np.uint8), np.empty((th, tw, 3), np.uint8))
+            self._ring[self._idx] = bufs
+        small, rgb = bufs
+        # shrink first, then convert colour on the small image
+        cv2.resize(frame_bgr, (tw, th), dst=small, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+        return rgb
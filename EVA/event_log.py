@@ -0,0 +1,31 @@
+from __future__ import annotations
+import logging, os, queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from config import EVENT_LOG_MAX_MB, EVENT_LOG_BACKUPS
+
+
+class EventLog:
+    """Rolling event log file. write() only enqueues; a listener thread does the file I/O,
+    so callers on the worker or Tk threads never wait on the disk."""
+
+    def __init__(self, path: str, max_mb: float = EVENT_LOG_MAX_MB, backups: int = EVENT_LOG_BACKUPS) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fh = RotatingFileHandler(path, maxBytes=int(max_mb * 1e6), backupCount=int(backups), encoding="utf-8")
+        fh.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        q: queue.Queue = queue.Queue(-1)
+        self._listener = QueueListener(q, fh)
+        self._logger = logging.getLogger(f"eva.events.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(QueueHandler(q))
+        self._fh = fh
+        self._listener.start()
+
+    def write(self, text: str) -> None:
+        self._logger.info(text)
+
+    def close(self) -> None:
+        self._listener.stop()  # flushes what is still queued
+        self._fh.close()
+        self._logger.handlers.clear()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+import hashlib, importlib.util, os, shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from config import EXPORT_ENABLED, EXPORT_FORMATS, EXPORT_IMGSZ, EXPORT_HALF, EXPORT_DIR
+
+# what each format needs installed to be exported and then run
+_REQUIRES: Dict[str, List[str]] = {
+    "openvino": ["openvino"],
+    "onnx": ["onnx", "onnxruntime"],
+    "ncnn": ["ncnn", "pnnx"],
+}
+_SUFFIX = {"openvino": "_openvino_model", "onnx": ".onnx", "ncnn": "_ncnn_model"}
+_hashes: Dict[Tuple[str, float, int], str] = {}
+
+
+def _missing(fmt: str) -> List[str]:
+    return [m for m in _REQUIRES.get(fmt, [fmt]) if importlib.util.find_spec(m) is None]
+
+def int8_path(path: str) -> str:
+    """Where quantize.py writes the INT8 model for `path`: best.pt -> best.int8.onnx."""
+    return os.path.splitext(path)[0] + ".int8.onnx"
+
+def weights_hash(path: str) -> str:
+    st = os.stat(path)
+    key = (os.path.realpath(path), st.st_mtime, st.st_size)
+    h = _hashes.get(key)
+    if h is None:
+        sha = hashlib.sha1()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                sha.update(chunk)
+        h = _hashes[key] = sha.hexdigest()[:16]
+    return h
+
+def artifact_path(pt_path: str, fmt: str, imgsz: int = EXPORT_IMGSZ, half: bool = EXPORT_HALF,
+                  cache_dir: Path = EXPORT_DIR) -> Path:
+    """Cache location, keyed by the weights' content hash and the export settings."""
+    stem = Path(pt_path).stem
+    return Path(cache_dir) / f"{stem}-{weights_hash(pt_path)}-{imgsz}{'-fp16' if half else ''}{_SUFFIX[fmt]}"
+
+def _export(pt_path: str, fmt: str, target: Path, imgsz: int, half: bool) -> None:
+    from ultralytics import YOLO
+    # export from a private copy: ultralytics writes next to the weights and could overwrite a user's file
+    work = target.parent / f".tmp-{target.name}"
+    shutil.rmtree(work, ignore_errors=True)
+    work.mkdir(parents=True)
+    try:
+        src = work / Path(pt_path).name
+        shutil.copy2(pt_path, src)
+        out = YOLO(str(src)).export(format=fmt, imgsz=imgsz, half=half)
+        os.replace(out, target)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def compiled_model(pt_path: str, formats: List[str] = EXPORT_FORMATS, imgsz: int = EXPORT_IMGSZ,
+                   half: bool = EXPORT_HALF, cache_dir: Path = EXPORT_DIR,
+                   exporter: Callable[[str, str, Path, int, bool], None] = _export) -> Tuple[str, str, str]:
+    """(path to load, backend, why). Non-.pt paths and failures come back unchanged as the weights."""
+    if not pt_path.lower().endswith(".pt"):
+        return pt_path, Path(pt_path).suffix.lstrip(".") or "model", "not a .pt file"
+    if not EXPORT_ENABLED:
+        return pt_path, "pytorch", "export disabled"
+    if not os.path.isfile(pt_path):
+        return pt_path, "pytorch", "weights not found"
+    reasons = []
+    for fmt in formats:
+        missing = _missing(fmt)
+        if missing:
+            reasons.append(f"{fmt}: {', '.join(missing)} not installed")
+            continue
+        target = artifact_path(pt_path, fmt, imgsz, half, cache_dir)
+        if target.exists():
+            return str(target), fmt, "cached export"
+        try:
+            exporter(pt_path, fmt, target, imgsz, half)
+        except Exception as e:
+            reasons.append(f"{fmt}: export failed ({e})")
+            continue
+        if target.exists():
+            return str(target), fmt, "exported now"
+        reasons.append(f"{fmt}: export produced nothing")
+    return pt_path, "pytorch", "; ".join(reasons) or "no export formats configured"
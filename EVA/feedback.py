@@ -0,0 +1,162 @@
+from __future__ import annotations
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from detections import Detections
+
+from utils import TL_SET, now_ms, normalize_label, choose_priority_label
+from config import (
+    CONF_THRESHOLD, CLASS_THRESHOLDS, BASE_CONF_FOR_MODEL, CLASS_COOLDOWNS_MS, CLASS_PRIORITY,
+    CLASS_STABLE_FRAMES, STABLE_FRAMES, MAX_VOICE_EVENTS_PER_CLASS, FEEDBACK_STRICT_STABILITY,
+)
+
+
+class FeedbackEvents(NamedTuple):
+    banner: Optional[str]     # label to show this frame
+    announce: Optional[str]   # label to speak this frame
+
+
+class FeedbackEngine:
+    """Turns per-frame detections into banner and announce events.
+
+    Applies the per-class thresholds, priority rules, traffic-light hysteresis, stability frames,
+    cooldowns and the per-class announcement cap. Holds no UI state and reads time from `clock`
+    (ms), so recorded detection streams can be replayed faster than real time. Work per frame is
+    proportional to the number of detections only.
+
+    When detections carry track ids, stability follows one track and a sign that is still being
+    tracked is not announced again, however often its class flickers. The per-class cooldown still
+    applies on top, so a sign that loses its track and is picked up under a new id stays quiet."""
+
+    def __init__(self, clock: Callable[[], int] = now_ms, tl_hysteresis_ms: int = 1200,
+                 thresholds: Optional[Dict[str, float]] = None, stable_frames: Optional[Dict[str, int]] = None,
+                 cooldowns_ms: Optional[Dict[str, int]] = None, max_events_per_class: int = MAX_VOICE_EVENTS_PER_CLASS,
+                 strict_stability: bool = FEEDBACK_STRICT_STABILITY) -> None:
+        self.clock = clock
+        self.tl_hysteresis_ms = int(tl_hysteresis_ms)
+        self.thresholds = dict(CLASS_THRESHOLDS if thresholds is None else thresholds)
+        self.stable_frames = dict(CLASS_STABLE_FRAMES if stable_frames is None else stable_frames)
+        self.cooldowns_ms = dict(CLASS_COOLDOWNS_MS if cooldowns_ms is None else cooldowns_ms)
+        self.max_events_per_class = int(max_events_per_class)
+        self.strict_stability = bool(strict_stability)
+        self._priority = {lab: i for i, lab in enumerate(CLASS_PRIORITY)}
+        self._min_conf: Dict[str, float] = {}
+        self._names_ref: Optional[Dict[int, str]] = None
+        self.per_class_last_ms: Dict[str, int] = {}
+        self.voice_events_count: Dict[str, int] = {}
+        self.per_track_last_ms: Dict[int, int] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        self.per_class_last_ms.clear(); self.voice_events_count.clear(); self._min_conf.clear()
+        self.per_track_last_ms.clear()
+        self._names_ref = None
+        # only the current winner can have a non-zero streak, so one (label, count) pair is enough
+        self._stable_label: Optional[str] = None
+        self._stable_track: Optional[int] = None
+        self._stable_count = 0
+        self._tl_last_label: Optional[str] = None
+        self._tl_last_change_ms = 0
+
+    def min_conf(self, label: str) -> float:
+        thr = self._min_conf.get(label)
+        if thr is None:
+            thr = self._min_conf[label] = max(BASE_CONF_FOR_MODEL, self.thresholds.get(label, CONF_THRESHOLD))
+        return thr
+
+    def _class_table(self, names: Dict[int, str]) -> None:
+        # normalized label and effective threshold per class id, rebuilt only when the model's names change
+        size = (max(names) + 1) if names else 0
+        self._labels_by_id = [normalize_label(names.get(i, str(i))) for i in range(size)]
+        self._thr_by_id = np.asarray([self.min_conf(lab) for lab in self._labels_by_id], dtype=np.float32)
+        self._names_ref = names
+
+    def present_labels(self, dets) -> List[str]:
+        return self._present(dets)[0]
+
+    def _present(self, dets) -> Tuple[List[str], Optional[List[int]]]:
+        """Labels above their threshold, with the matching track ids when the detections are tracked."""
+        if isinstance(dets, Detections):
+            if dets.names is not self._names_ref:
+                self._class_table(dets.names)
+            if not len(dets):
+                return [], None
+            if int(dets.cls.max()) >= len(self._thr_by_id) or int(dets.cls.min()) < 0:
+                return self._present(dets.to_dicts())
+            ok = dets.conf >= self._thr_by_id[dets.cls]
+            ids = None if dets.ids is None else dets.ids[ok].tolist()
+            return [self._labels_by_id[c] for c in dets.cls[ok].tolist()], ids
+        present: List[str] = []
+        ids: List[int] = []
+        for d in dets:
+            label = normalize_label(d.get("label", ""))
+            if float(d.get("conf", 0.0)) >= self.min_conf(label):
+                present.append(label)
+                ids.append(d.get("track_id"))
+        return present, (ids if ids and None not in ids else None)
+
+    def _winner_track(self, winner: str, present: List[str], ids: List[int]) -> Tuple[int, List[int]]:
+        # stay on the track we are already counting, so two lights of one colour do not reset each other
+        tracks = [t for lab, t in zip(present, ids) if lab == winner]
+        if winner == self._stable_label and self._stable_track in tracks:
+            return self._stable_track, tracks
+        return tracks[0], tracks
+
+    def update(self, dets, now: Optional[int] = None) -> FeedbackEvents:
+        if now is None:
+            now = self.clock()
+        present, ids = self._present(dets)
+
+        winner = choose_priority_label(present)
+        if not winner and present:
+            ranked = [lab for lab in present if lab in self._priority]
+            if ranked:
+                winner = min(ranked, key=self._priority.__getitem__)
+
+        if winner in TL_SET:
+            if self._tl_last_label and winner != self._tl_last_label:
+                if (now - self._tl_last_change_ms) < self.tl_hysteresis_ms:
+                    winner = self._tl_last_label
+                else:
+                    self._tl_last_label = winner
+                    self._tl_last_change_ms = now
+            elif self._tl_last_label is None:
+                self._tl_last_label = winner
+                self._tl_last_change_ms = now
+
+        to_speak = None
+        if winner:
+            track, tracks = None, None
+            if ids is not None and winner in present:  # not when hysteresis held a colour that is gone
+                track, tracks = self._winner_track(winner, present, ids)
+            elif winner == self._stable_label:
+                track = self._stable_track
+            if winner == self._stable_label and track == self._stable_track:
+                self._stable_count += 1
+            else:
+                self._stable_label, self._stable_track, self._stable_count = winner, track, 1
+            req = self.stable_frames.get(winner, STABLE_FRAMES) if self.strict_stability else 1
+            if self._stable_count >= req:
+                cd = self.cooldowns_ms.get(winner, 6000)
+                last = self.per_class_last_ms.get(winner)
+                if tracks is not None:
+                    # any visible track of this class still in cooldown counts as already announced
+                    seen = [self.per_track_last_ms[t] for t in tracks if t in self.per_track_last_ms]
+                    if seen:
+                        last = max(seen + ([] if last is None else [last]))
+                if last is None or (now - last) >= cd:
+                    cnt = self.voice_events_count.get(winner, 0)
+                    if self.max_events_per_class < 0 or cnt < self.max_events_per_class:
+                        to_speak = winner
+                        self.per_class_last_ms[winner] = now
+                        if track is not None:
+                            self._mark_track(track, now)
+                        self.voice_events_count[winner] = cnt + 1
+        return FeedbackEvents(winner, to_speak)
+
+    def _mark_track(self, track: int, now: int) -> None:
+        self.per_track_last_ms[track] = now
+        if len(self.per_track_last_ms) > 256:  # ids only grow; forget the oldest announcements
+            for t in sorted(self.per_track_last_ms, key=self.per_track_last_ms.get)[:128]:
+                del self.per_track_last_ms[t]
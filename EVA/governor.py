@@ -0,0 +1,90 @@
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from pipeline import StageTimes
+from config import (GOVERNOR_TARGET_LATENCY_MS, GOVERNOR_CPU_BUDGET, GOVERNOR_MOTION_SIZE, GOVERNOR_MOTION_LOW,
+                    GOVERNOR_MOTION_HIGH, GOVERNOR_MIN_DUTY, GOVERNOR_MAX_GAP)
+
+INFER, TRACK, SKIP = "infer", "track", "skip"
+
+
+class FrameGovernor:
+    """Chooses per frame whether to run the detector, only advance the tracker, or drop the frame.
+
+    A duty cycle (share of frames that get a detector pass) backs off multiplicatively while the
+    smoothed capture-to-feedback latency in `times` is above `target_ms` and creeps back up once it
+    is below. GOVERNOR_CPU_BUDGET further caps it at that share of the frame interval spent in
+    inference; the interval is the smoothed gap between capture ticks, not how long a read blocked.
+    Scene motion, the mean absolute difference of consecutive downscaled grey frames, spends the
+    duty faster when things move and slower when the view is static."""
+
+    def __init__(self, times: Optional[StageTimes] = None, target_ms: float = GOVERNOR_TARGET_LATENCY_MS,
+                 cpu_budget: float = GOVERNOR_CPU_BUDGET, motion_size: Tuple[int, int] = GOVERNOR_MOTION_SIZE,
+                 motion_low: float = GOVERNOR_MOTION_LOW, motion_high: float = GOVERNOR_MOTION_HIGH,
+                 min_duty: float = GOVERNOR_MIN_DUTY, max_gap: int = GOVERNOR_MAX_GAP) -> None:
+        self.times = times if times is not None else StageTimes()
+        self.target_ms = float(target_ms)
+        self.cpu_budget = float(cpu_budget)
+        self.motion_size = (int(motion_size[0]), int(motion_size[1]))
+        self.motion_low = float(motion_low)
+        self.motion_high = float(motion_high)
+        self.min_duty = float(min_duty)
+        self.max_gap = max(1, int(max_gap))
+        self.reset()
+
+    def reset(self) -> None:
+        self.duty = 1.0
+        self.motion = 0.0
+        self._prev: Optional[np.ndarray] = None
+        self._credit = 1.0
+        self._since_infer = 0
+        self.counts: Dict[str, int] = {INFER: 0, TRACK: 0, SKIP: 0}
+
+    def motion_score(self, frame: np.ndarray) -> float:
+        """0..1, mean absolute grey-level change since the previous frame at GOVERNOR_MOTION_SIZE."""
+        small = cv2.resize(frame, self.motion_size, interpolation=cv2.INTER_AREA)
+        grey = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        prev, self._prev = self._prev, grey
+        if prev is None:
+            return 1.0
+        return float(cv2.absdiff(grey, prev).mean()) / 255.0
+
+    def _update_duty(self) -> None:
+        latency = self.times.ms.get("frame_age")
+        if latency is not None:
+            if latency > self.target_ms:
+                self.duty = max(self.min_duty, self.duty * 0.85)
+            else:
+                self.duty = min(1.0, self.duty + 0.02)
+        infer_ms, interval_ms = self.times.ms.get("inference"), self.times.ms.get("capture_interval")
+        if self.cpu_budget > 0 and infer_ms and interval_ms:
+            self.duty = min(self.duty, max(self.min_duty, self.cpu_budget * interval_ms / infer_ms))
+
+    def decide(self, frame: np.ndarray, can_track: bool = False) -> str:
+        self.motion = self.motion_score(frame)
+        self._update_duty()
+        if self.motion >= self.motion_high:
+            gain = 2.0
+        elif self.motion <= self.motion_low:
+            gain = 0.5
+        else:
+            gain = 1.0
+        self._credit = min(2.0, self._credit + self.duty * gain)
+        self._since_infer += 1
+        if self._credit >= 1.0 or self._since_infer >= self.max_gap:
+            self._credit = max(0.0, self._credit - 1.0)
+            self._since_infer = 0
+            action = INFER
+        else:
+            action = TRACK if can_track else SKIP
+        self.counts[action] += 1
+        return action
+
+    def stats(self) -> Dict[str, float]:
+        total = max(1, sum(self.counts.values()))
+        out = {f"{k}_share": v / total for k, v in self.counts.items()}
+        out.update({"duty": self.duty, "motion": self.motion, "frames": float(sum(self.counts.values()))})
+        return out
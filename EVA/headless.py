@@ -0,0 +1,148 @@
+from __future__ import annotations
+import argparse, csv, json, os, sys, time
+from typing import Dict, Optional
+
+import cv2
+
+from detections import Detections
+from detector import YoloDetector, SourceConfig
+from feedback import FeedbackEngine
+from tracker import IouTracker
+
+CSV_FIELDS = ["type", "video", "frame", "t_ms", "label", "conf", "x1", "y1", "x2", "y2", "track_id"]
+
+
+class ResultWriter:
+    """Per-frame detections and announcement events as JSONL (one record per line) or CSV (one row per box)."""
+
+    def __init__(self, path: Optional[str], fmt: str) -> None:
+        self.fmt = fmt
+        self._fh = open(path, "w", newline="", encoding="utf-8") if path else sys.stdout
+        self._csv = csv.DictWriter(self._fh, fieldnames=CSV_FIELDS) if fmt == "csv" else None
+        if self._csv:
+            self._csv.writeheader()
+
+    def frame(self, video: str, idx: int, t_ms: int, dets: Detections) -> None:
+        if self._csv is None:
+            self._fh.write(json.dumps({"type": "frame", "video": video, "frame": idx, "t_ms": t_ms, "dets": dets.to_dicts()}) + "\n")
+            return
+        ids = dets.ids.tolist() if dets.ids is not None else [""] * len(dets)
+        for (x1, y1, x2, y2), conf, label, tid in zip(dets.xyxy.tolist(), dets.conf.tolist(), dets.labels, ids):
+            self._csv.writerow({"type": "det", "video": video, "frame": idx, "t_ms": t_ms, "label": label,
+                                "conf": round(conf, 4), "x1": x1, "y1": y1, "x2": x2, "y2": y2, "track_id": tid})
+
+    def event(self, video: str, idx: int, t_ms: int, kind: str, label: str) -> None:
+        if self._csv is None:
+            self._fh.write(json.dumps({"type": kind, "video": video, "frame": idx, "t_ms": t_ms, "label": label}) + "\n")
+        else:
+            self._csv.writerow({"type": kind, "video": video, "frame": idx, "t_ms": t_ms, "label": label})
+
+    def close(self) -> None:
+        if self._fh is not sys.stdout:
+            self._fh.close()
+
+
+def run_video(det: YoloDetector, engine: FeedbackEngine, path: str, writer: ResultWriter,
+              max_frames: int = 0, tracker: Optional[IouTracker] = None, stride: int = 1,
+              start_ms: float = 0.0, pacing: str = "fast") -> Dict[str, float]:
+    """Runs one file, by default as fast as possible. Cooldowns and hysteresis run on the video's own timestamps.
+    With a tracker the detector only runs on the frames the tracker asks for; `stride` skips frames before decode."""
+    if not det.open_source(SourceConfig(mode="video", video_path=path, stride=stride, start_ms=start_ms, pacing=pacing)):
+        print(f"skip {path}: cannot open", file=sys.stderr)
+        return {}
+    engine.reset()
+    if tracker is not None:
+        tracker.reset()
+    totals = {"read": 0.0, "infer": 0.0, "feedback": 0.0}
+    idx = 0; announced = 0; last_banner = None
+    t_start = time.perf_counter()
+    while not max_frames or idx < max_frames:
+        t0 = time.perf_counter()
+        ok, frame = det.read_frame()
+        if not ok:
+            break
+        t_ms = int(det.cap.get(cv2.CAP_PROP_POS_MSEC))
+        t1 = time.perf_counter()
+        if tracker is None:
+            dets = det.predict(frame)
+        elif tracker.should_detect():
+            dets = tracker.update(det.predict(frame))
+        else:
+            dets = tracker.predict()
+        t2 = time.perf_counter()
+        winner, to_speak = engine.update(dets, now=t_ms)
+        writer.frame(path, idx, t_ms, dets)
+        if winner and winner != last_banner:
+            writer.event(path, idx, t_ms, "banner", winner)
+            last_banner = winner
+        if to_speak:
+            writer.event(path, idx, t_ms, "announce", to_speak)
+            announced += 1
+        t3 = time.perf_counter()
+        for k, dt in (("read", t1 - t0), ("infer", t2 - t1), ("feedback", t3 - t2)):
+            totals[k] += dt * 1000.0
+        idx += 1
+    det.close()
+    wall = time.perf_counter() - t_start
+    n = max(1, idx)
+    stats = {"frames": idx, "seconds": wall, "fps": idx / wall if wall > 0 else 0.0, "announced": announced}
+    stats.update({f"{k}_ms": v / n for k, v in totals.items()})
+    return stats
+
+
+def _print_stats(name: str, st: Dict[str, float]) -> None:
+    print(f"{name}: {st['frames']} frames in {st['seconds']:.1f}s = {st['fps']:.2f} frames/s | "
+          f"read {st['read_ms']:.1f} ms, infer {st['infer_ms']:.1f} ms, feedback {st['feedback_ms']:.2f} ms/frame | "
+          f"{st['announced']} announcements", file=sys.stderr)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Run detection and feedback rules over video files without the GUI.")
+    ap.add_argument("videos", nargs="+")
+    ap.add_argument("--scope", default="both", choices=["traffic_lights", "road_signs", "both"])
+    ap.add_argument("--model", default=None, help="weights to use instead of the scope's candidate list")
+    ap.add_argument("--out", default=None, help="output file (stdout if omitted)")
+    ap.add_argument("--format", default=None, choices=["jsonl", "csv"], help="defaults to the --out extension, else jsonl")
+    ap.add_argument("--max-frames", type=int, default=0, help="stop each video after this many frames (0 = all)")
+    ap.add_argument("--track", type=int, default=0, metavar="N",
+                    help="track between detector passes, running the detector every N frames (0 = every frame, no tracker)")
+    ap.add_argument("--stride", type=int, default=1, help="process every Nth frame; the others are never decoded")
+    ap.add_argument("--start", type=float, default=0.0, metavar="SEC", help="start each video at this timestamp")
+    ap.add_argument("--pacing", default="fast", choices=["fast", "realtime"],
+                    help="realtime plays at the file's frame rate and drops frames processing falls behind on")
+    args = ap.parse_args()
+
+    fmt = args.format or ("csv" if args.out and args.out.lower().endswith(".csv") else "jsonl")
+    det = YoloDetector()
+    tracker = IouTracker(detect_every=args.track) if args.track else None
+    if args.model:
+        det.load(args.model)
+        det.set_scope(args.scope)
+    else:
+        det.load_for_scope(args.scope)
+    for weights, backend in det.backends.items():
+        print(f"model {weights}: {backend}", file=sys.stderr)
+    engine = FeedbackEngine()
+    writer = ResultWriter(args.out, fmt)
+    total = {"frames": 0, "seconds": 0.0, "announced": 0, "read_ms": 0.0, "infer_ms": 0.0, "feedback_ms": 0.0}
+    try:
+        for path in args.videos:
+            st = run_video(det, engine, os.path.abspath(path), writer, args.max_frames, tracker,
+                           args.stride, args.start * 1000.0, args.pacing)
+            if not st:
+                continue
+            _print_stats(os.path.basename(path), st)
+            for k in ("read_ms", "infer_ms", "feedback_ms"):
+                total[k] += st[k] * st["frames"]
+            total["frames"] += st["frames"]; total["seconds"] += st["seconds"]; total["announced"] += st["announced"]
+    finally:
+        writer.close()
+    if len(args.videos) > 1 and total["frames"]:
+        n = total["frames"]
+        for k in ("read_ms", "infer_ms", "feedback_ms"):
+            total[k] /= n
+        total["fps"] = n / total["seconds"] if total["seconds"] > 0 else 0.0
+        _print_stats("total", total)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+import json, os, threading, time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+import numpy as np
+
+from pipeline import StageTimes
+from config import METRICS_WINDOW, METRICS_DUMP_S
+
+
+class _Timer:
+    __slots__ = ("sink", "stage", "t0")
+
+    def __init__(self, sink: StageTimes, stage: str) -> None:
+        self.sink, self.stage = sink, stage
+
+    def __enter__(self) -> "_Timer":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.sink.add(self.stage, (time.perf_counter() - self.t0) * 1000.0)
+
+
+class NullMetrics(StageTimes):
+    """The Metrics interface over plain StageTimes: smoothed stage times only, no windows,
+    counters or reports. Used when METRICS_ENABLED is off. tick() still keeps the smoothed gap
+    between ticks as `<name>_interval`."""
+
+    enabled = False
+
+    def __init__(self, alpha: float = 0.1) -> None:
+        super().__init__(alpha)
+        self._last_tick: Dict[str, float] = {}
+
+    def clear(self) -> None:
+        super().clear()
+        self._last_tick.clear()
+
+    def timer(self, stage: str) -> _Timer:
+        return _Timer(self, stage)
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+    def tick(self, name: str) -> None:
+        now = time.perf_counter()
+        prev, self._last_tick[name] = self._last_tick.get(name), now
+        if prev is not None:
+            StageTimes.add(self, f"{name}_interval", (now - prev) * 1000.0)
+
+    def watch(self, name: str, fn: Callable[[], float]) -> None:
+        pass
+
+    def report(self) -> Dict[str, object]:
+        return {}
+
+    def overlay_text(self) -> str:
+        return ""
+
+
+class Metrics(NullMetrics):
+    """Rolling per-stage samples (perf_counter ms) with p50/p95/p99, event counters, FPS from
+    tick timestamps and watched gauges (queue depths, drop counters) read at report time.
+
+    Workers only append under a lock; percentiles are computed when report() is called."""
+
+    enabled = True
+
+    def __init__(self, window: int = METRICS_WINDOW, alpha: float = 0.1) -> None:
+        super().__init__(alpha)
+        self.window = max(10, int(window))
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._ticks: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def add(self, stage: str, ms: float) -> None:
+        super().add(stage, ms)
+        with self._lock:
+            d = self._samples.get(stage)
+            if d is None:
+                d = self._samples[stage] = deque(maxlen=self.window)
+            d.append(ms)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + n
+
+    def tick(self, name: str) -> None:
+        super().tick(name)
+        with self._lock:
+            d = self._ticks.get(name)
+            if d is None:
+                d = self._ticks[name] = deque(maxlen=self.window)
+            d.append(time.perf_counter())
+
+    def watch(self, name: str, fn: Callable[[], float]) -> None:
+        self._gauges[name] = fn
+
+    def clear(self) -> None:
+        super().clear()
+        with self._lock:
+            self._samples.clear(); self._ticks.clear(); self._counts.clear()
+
+    def report(self) -> Dict[str, object]:
+        with self._lock:
+            samples = {k: np.fromiter(d, np.float64, len(d)) for k, d in self._samples.items() if d}
+            ticks = {k: (len(d), d[0], d[-1]) for k, d in self._ticks.items() if len(d) > 1}
+            counts = dict(self._counts)
+        stages = {}
+        for k, a in samples.items():
+            p50, p95, p99 = np.percentile(a, (50, 95, 99))
+            stages[k] = {"p50": round(float(p50), 2), "p95": round(float(p95), 2), "p99": round(float(p99), 2), "n": len(a)}
+        fps = {k: round((n - 1) / (t1 - t0), 2) if t1 > t0 else 0.0 for k, (n, t0, t1) in ticks.items()}
+        gauges = {}
+        for k, fn in self._gauges.items():
+            try:
+                gauges[k] = fn()
+            except Exception:
+                pass
+        return {"stages": stages, "fps": fps, "counts": counts, "gauges": gauges}
+
+    def overlay_text(self) -> str:
+        rep = self.report()
+        parts = [f"{k} {v:.1f} fps" for k, v in rep["fps"].items()]
+        for k in ("capture", "inference", "feedback", "frame_age"):
+            s = rep["stages"].get(k)
+            if s:
+                parts.append(f"{k} {s['p50']:.0f}/{s['p95']:.0f} ms")
+        drops = sum(v for k, v in rep["gauges"].items() if k.endswith("dropped"))
+        if drops:
+            parts.append(f"dropped {drops}")
+        return "  |  ".join(parts)
+
+
+class MetricsDumper:
+    """Appends metrics.report() as one JSON line to `path` every `every_s` seconds."""
+
+    def __init__(self, metrics: Metrics, path: str, every_s: float = METRICS_DUMP_S) -> None:
+        self.metrics, self.path, self.every_s = metrics, path, float(every_s)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.every_s):
+            self.dump()
+
+    def dump(self) -> None:
+        rep = self.metrics.report()
+        rep["time"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        try:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(rep) + "\n")
+        except OSError:
+            pass
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self.dump()
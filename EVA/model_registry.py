@@ -0,0 +1,151 @@
+from __future__ import annotations
+import os, threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from export_cache import compiled_model, int8_path
+from config import FRAME_WIDTH, FRAME_HEIGHT, MODEL_CACHE_MAX_MODELS, MODEL_CACHE_MAX_MB, MODEL_WARMUP, ONNX_BACKEND, PREFER_INT8_MODELS
+
+Key = Tuple[str, float]
+
+
+@dataclass
+class LoadedModel:
+    path: str
+    model: object
+    names: Dict[int, str]
+    size_mb: float
+    backend: str = "pytorch"
+    reason: str = ""            # why this backend was used
+
+
+def _load_yolo(path: str) -> Tuple[object, str, str]:
+    """(model, backend, reason). .pt weights are swapped for their cached CPU export when possible."""
+    q = int8_path(path)
+    if PREFER_INT8_MODELS and os.path.isfile(q):
+        src, backend, reason = q, "onnx", "int8 model preferred"
+    else:
+        src, backend, reason = compiled_model(path)
+    if src.lower().endswith(".onnx") and ONNX_BACKEND == "onnxruntime":
+        try:
+            from detector import OnnxYolo
+            return OnnxYolo(src), "onnxruntime", reason
+        except ImportError:
+            reason += "; onnxruntime not installed, running it through ultralytics"
+    from ultralytics import YOLO
+    return YOLO(src, task="detect"), backend, reason
+
+def _read_names(model) -> Dict[int, str]:
+    # exported models (.onnx) only expose names once the predictor is set up; YOLO.names does that for us
+    try:
+        names = model.names
+    except Exception:
+        return {}
+    if isinstance(names, (list, tuple)):
+        names = dict(enumerate(names))
+    return {int(k): str(v) for k, v in (names or {}).items()}
+
+
+class ModelRegistry:
+    """Loaded models keyed by (resolved path, mtime), least recently used evicted first.
+
+    The memory cap uses the weights' file size as the footprint estimate. preload() loads and
+    warms a model on a background thread, so a later get() for the same file returns at once."""
+
+    def __init__(self, max_models: int = MODEL_CACHE_MAX_MODELS, max_mb: float = MODEL_CACHE_MAX_MB,
+                 loader: Callable[[str], Tuple[object, str, str]] = _load_yolo, warmup: bool = MODEL_WARMUP) -> None:
+        self.max_models = max(1, int(max_models))
+        self.max_mb = float(max_mb)
+        self.loader = loader
+        self.warmup = bool(warmup)
+        self._models: "OrderedDict[Key, LoadedModel]" = OrderedDict()
+        self._pending: Dict[Key, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(path: str) -> Key:
+        p = os.path.realpath(path)
+        try:
+            return p, os.path.getmtime(p)
+        except OSError:
+            return p, 0.0
+
+    def get(self, path: str) -> LoadedModel:
+        key = self.key(path)
+        while True:
+            with self._lock:
+                entry = self._models.get(key)
+                if entry is not None:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                pending = self._pending.get(key)
+                if pending is None:
+                    self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            pending.wait()  # a background preload of the same file is in flight
+            with self._lock:
+                if key not in self._models:
+                    raise RuntimeError(f"background load of {path} failed")
+        return self._load(key)
+
+    def preload(self, path: str) -> None:
+        key = self.key(path)
+        with self._lock:
+            if key in self._models or key in self._pending:
+                return
+            self._pending[key] = threading.Event()
+        threading.Thread(target=self._load_quietly, args=(key,), daemon=True).start()
+
+    def _load_quietly(self, key: Key) -> None:
+        try:
+            self._load(key)
+        except Exception:
+            pass
+
+    def _load(self, key: Key) -> LoadedModel:
+        path = key[0]
+        try:
+            model, backend, reason = self.loader(path)
+            if self.warmup:
+                model.predict(np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), np.uint8), verbose=False)
+            size_mb = os.path.getsize(path) / 1e6 if os.path.isfile(path) else 0.0
+            entry = LoadedModel(path, model, _read_names(model), size_mb, backend, reason)
+            with self._lock:
+                # a newer mtime replaces the stale copy of the same file
+                for k in [k for k in self._models if k[0] == path]:
+                    del self._models[k]
+                self._models[key] = entry
+                self._evict()
+            return entry
+        finally:
+            with self._lock:
+                ev = self._pending.pop(key, None)
+            if ev is not None:
+                ev.set()
+
+    def _evict(self) -> None:
+        while len(self._models) > 1 and (len(self._models) > self.max_models or
+                                         sum(e.size_mb for e in self._models.values()) > self.max_mb):
+            self._models.popitem(last=False)
+
+    def backends(self) -> Dict[str, str]:
+        with self._lock:
+            return {e.path: f"{e.backend} ({e.reason})" for e in self._models.values()}
+
+    def loaded(self) -> Dict[str, float]:
+        with self._lock:
+            return {e.path: e.size_mb for e in self._models.values()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+
+shared_registry = ModelRegistry()
@@ -1,6 +1,6 @@
 from __future__ import annotations
-import os, threading, queue, time
-from typing import Dict, Optional
+import os, threading, time
+from typing import Dict, Tuple
 
 try:
     import pygame
@@ -8,23 +8,47 @@ try:
 except Exception:
     _HAVE_PYGAME = False
 
-from config import MP3_VOLUME, MP3_REPEAT_GAP_MS
+from announcer import Announcer
+from config import MP3_VOLUME, MP3_REPEAT_GAP_MS, MIXER_FREQUENCY, MIXER_BUFFER
+
+def init_mixer() -> None:
+    """Opens the pygame mixer once, with the small buffer both voice backends rely on."""
+    if not pygame.mixer.get_init():
+        pygame.mixer.pre_init(frequency=MIXER_FREQUENCY, size=-16, channels=2, buffer=MIXER_BUFFER)
+        pygame.mixer.init()
 
 class Mp3Manager:
+    """Plays the MP3 prompts from Sounds decoded once at startup, on a reserved mixer channel.
+
+    Repeats are joined with `repeat_gap_ms` of silence into one buffer, so a prompt is a single
+    play() and the worker just waits out its length. Prompts go through an Announcer, which orders
+    and preempts them; its latency is from play_label() to the first sample leaving the mixer
+    (play() call plus one mixer buffer)."""
     available_reason: str = ''
-    def __init__(self, lang_to_label_to_path: Dict[str, Dict[str, str]], repeat_gap_ms: int = 800) -> None:
+    def __init__(self, lang_to_label_to_path: Dict[str, Dict[str, str]], repeat_gap_ms: int = MP3_REPEAT_GAP_MS) -> None:
         self.available: bool = False
         self._muted: bool = False
         self.lang: str = "en"
         self.paths = lang_to_label_to_path
         self.repeat_gap_ms = repeat_gap_ms
-        self._q = queue.Queue()  # type: queue.Queue[str]
+        self.announcer = Announcer()
+        self.announcer.on_preempt = self._cut
         self._stop = threading.Event()
+        # existence is checked once here, not on every announcement
+        self._files: Dict[Tuple[str, str], str] = {
+            (lang, label): os.path.abspath(p)
+            for lang, d in lang_to_label_to_path.items() for label, p in d.items()
+            if p and os.path.exists(p)}
+        self._sounds: Dict[Tuple[str, str], object] = {}
+        self._joined: Dict[Tuple[str, str, int], object] = {}
+        self._chan = None
 
         if _HAVE_PYGAME:
             try:
-                pygame.mixer.init()
-                pygame.mixer.music.set_volume(float(MP3_VOLUME))
+                init_mixer()
+                pygame.mixer.set_reserved(1)
+                self._chan = pygame.mixer.Channel(0)
+                self._chan.set_volume(float(MP3_VOLUME))
                 self.available = True
                 self.available_reason = 'pygame OK'
             except Exception as e:
@@ -40,18 +64,17 @@ class Mp3Manager:
     def play_label(self, label: str, repeat: int = 1) -> bool:
         if not self.available or self._muted:
             return False
-        p = self._resolve_path(label)
-        if p and os.path.exists(p):
-            for _ in range(max(1, int(repeat))):
-                self._q.put(p)
-            return True
-        return False
+        if (self.lang, label) not in self._files:
+            return False
+        self.announcer.submit(label, (self.lang, label), repeat)
+        return True
 
     def mute(self, flag: bool) -> None:
         self._muted = flag
 
     def stop(self) -> None:
         self._stop.set()
+        self.announcer.preempted.set()
         if _HAVE_PYGAME and self.available:
             try:
                 pygame.mixer.stop()
@@ -59,24 +82,71 @@ class Mp3Manager:
             except Exception:
                 pass
 
-    def _resolve_path(self, label: str) -> Optional[str]:
-        d = self.paths.get(self.lang) or {}
-        return os.path.abspath(d.get(label, "")) if d.get(label) else None
-
-    def _run(self) -> None:
-        import pygame
-        while not self._stop.is_set():
+    def _preload(self) -> None:
+        for key, path in self._files.items():
             try:
-                path = self._q.get(timeout=0.1)
-            except queue.Empty:
-                continue
-            # Load and start playback
+                self._sounds[key] = pygame.mixer.Sound(path)
+            except Exception:
+                pass  # older SDL_mixer cannot decode MP3 into a Sound; _play_music streams it instead
+
+    def _joined_sound(self, lang: str, label: str, repeat: int):
+        """The clip `repeat` times with the gap in between, built once per (lang, label, repeat)."""
+        key = (lang, label, repeat)
+        snd = self._joined.get(key)
+        if snd is None:
+            base = self._sounds[(lang, label)]
+            if repeat == 1:
+                snd = base
+            else:
+                import numpy as np
+                pcm = pygame.sndarray.array(base)
+                freq = pygame.mixer.get_init()[0]
+                gap = np.zeros((int(freq * self.repeat_gap_ms / 1000.0),) + pcm.shape[1:], pcm.dtype)
+                parts = [pcm, gap] * repeat
+                snd = pygame.sndarray.make_sound(np.ascontiguousarray(np.concatenate(parts[:-1])))
+            self._joined[key] = snd
+        return snd
+
+    def _cut(self) -> None:
+        try:
+            self._chan.stop()
+            pygame.mixer.music.stop()
+        except Exception:
+            pass
+
+    def _report(self, prompt) -> None:
+        self.announcer.started(prompt, MIXER_BUFFER * 1000.0 / pygame.mixer.get_init()[0])
+
+    def _play_music(self, path: str, repeat: int, prompt) -> None:
+        for i in range(repeat):
             try:
                 pygame.mixer.music.load(path)
+                pygame.mixer.music.set_volume(float(MP3_VOLUME))
                 pygame.mixer.music.play()
             except Exception:
-                continue
-            # Wait until current finishes before playing next
+                return
+            if i == 0:
+                self._report(prompt)
             while not self._stop.is_set() and pygame.mixer.music.get_busy():
                 time.sleep(0.02)
-            time.sleep(0.02)
+            if i + 1 < repeat and self.announcer.preempted.wait(self.repeat_gap_ms / 1000.0):
+                return
+
+    def _run(self) -> None:
+        self._preload()
+        while not self._stop.is_set():
+            prompt = self.announcer.next(timeout=0.1)
+            if prompt is None:
+                continue
+            (lang, label), repeat = prompt.payload, prompt.times
+            if (lang, label) not in self._sounds:
+                self._play_music(self._files[(lang, label)], repeat, prompt)
+                continue
+            try:
+                snd = self._joined_sound(lang, label, repeat)
+                self._chan.play(snd)
+            except Exception:
+                continue
+            self._report(prompt)
+            # the prompt's own length replaces polling get_busy(); a preempting prompt cuts the wait short
+            self.announcer.preempted.wait(snd.get_length())
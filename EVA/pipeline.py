@@ -0,0 +1,120 @@
+from __future__ import annotations
+import threading, time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class FramePacket:
+    seq: int
+    frame: object
+    t_capture: float                      # time.perf_counter() when the frame left the camera
+    dets: object = None                   # Detections once the inference stage is done
+
+    def age_ms(self) -> float:
+        return (time.perf_counter() - self.t_capture) * 1000.0
+
+
+class LatestSlot:
+    """Bounded hand-off between two pipeline stages. When full, put() drops the oldest item;
+    put(block=True) waits for room instead and returns False, item not added, on timeout."""
+
+    def __init__(self, maxlen: int = 1) -> None:
+        self._items = deque(maxlen=max(1, int(maxlen)))
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item, block: bool = False, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            if block and len(self._items) == self._items.maxlen:
+                if not self._cond.wait_for(lambda: len(self._items) < self._items.maxlen, timeout):
+                    return False
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None):
+        with self._cond:
+            if not self._items and not self._cond.wait_for(lambda: bool(self._items), timeout):
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def clear(self) -> None:
+        with self._cond:
+            self._items.clear()
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class StageTimes:
+    """Smoothed per-stage durations in milliseconds, written by the worker threads."""
+
+    def __init__(self, alpha: float = 0.1) -> None:
+        self.alpha = float(alpha)
+        self.ms: Dict[str, float] = {}
+        self.last: Dict[str, float] = {}
+
+    def add(self, stage: str, ms: float) -> None:
+        prev = self.ms.get(stage)
+        self.ms[stage] = ms if prev is None else prev + self.alpha * (ms - prev)
+        self.last[stage] = ms
+
+    def clear(self) -> None:
+        self.ms.clear(); self.last.clear()
+
+    def snapshot(self) -> Dict[str, float]:
+        return dict(self.ms)
+
+
+class UiChannel:
+    """Worker -> Tk thread messages. Images and banners collapse to the newest value,
+    recent-log lines stay in order but only the last `recent_cap` are kept."""
+
+    def __init__(self, recent_cap: int = 30) -> None:
+        self._lock = threading.Lock()
+        self._image = None
+        self._banner = None
+        self._recent = deque(maxlen=max(1, int(recent_cap)))
+        self.images_in = 0
+        self.images_dropped = 0
+        self.banners_coalesced = 0
+        self.recent_dropped = 0
+
+    def put(self, item: Tuple[str, object]) -> None:
+        typ, payload = item
+        with self._lock:
+            if typ == "image":
+                self.images_in += 1
+                if self._image is not None:
+                    self.images_dropped += 1
+                self._image = payload
+            elif typ == "banner":
+                if self._banner is not None:
+                    self.banners_coalesced += 1
+                self._banner = payload
+            else:
+                if len(self._recent) == self._recent.maxlen:
+                    self.recent_dropped += 1
+                self._recent.append((typ, payload))
+
+    def drain(self) -> List[Tuple[str, object]]:
+        """Everything pending, log lines first, then the latest banner and image."""
+        with self._lock:
+            out = list(self._recent)
+            self._recent.clear()
+            if self._banner is not None:
+                out.append(("banner", self._banner)); self._banner = None
+            if self._image is not None:
+                out.append(("image", self._image)); self._image = None
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        return {"images_in": self.images_in, "images_dropped": self.images_dropped,
+                "banners_coalesced": self.banners_coalesced, "recent_dropped": self.recent_dropped}
@@ -0,0 +1,203 @@
+from __future__ import annotations
+import argparse, glob, json, os, sys, time
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from boxops import iou_matrix
+from config import DETECTION_MODEL_CANDIDATES, ONNX_IMGSZ
+from detections import Detections
+from detector import OnnxYolo, letterbox, min_effective_conf, pick_model_for_scope
+from export_cache import compiled_model, int8_path
+from utils import normalize_label
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv")
+
+
+def load_frames(folder: str, limit: int, video_stride: int = 15) -> List[np.ndarray]:
+    """Images in `folder`, plus every `video_stride`-th frame of any video in it, up to `limit`."""
+    frames: List[np.ndarray] = []
+    for path in sorted(glob.glob(os.path.join(folder, "*"))):
+        if len(frames) >= limit:
+            break
+        ext = os.path.splitext(path)[1].lower()
+        if ext in IMAGE_EXTS:
+            img = cv2.imread(path)
+            if img is not None:
+                frames.append(img)
+        elif ext in VIDEO_EXTS:
+            cap = cv2.VideoCapture(path)
+            idx = 0
+            while len(frames) < limit:
+                if not cap.grab():
+                    break
+                if idx % video_stride == 0:
+                    ok, img = cap.retrieve()
+                    if ok:
+                        frames.append(img)
+                idx += 1
+            cap.release()
+    return frames
+
+def split_frames(frames: List[np.ndarray], n_calib: int, n_eval: int):
+    """(calib, held): up to `n_eval` held-out frames spread evenly through `frames`, interleaved with
+    up to `n_calib` calibration frames so both cover the same scenes. Short inputs split in proportion."""
+    n = len(frames)
+    if n < n_calib + n_eval:
+        n_eval = n * n_eval // max(1, n_calib + n_eval)
+    held_idx = set(((np.arange(n_eval) + 0.5) * n / max(1, n_eval)).astype(int).tolist())
+    held = [f for i, f in enumerate(frames) if i in held_idx]
+    calib = [f for i, f in enumerate(frames) if i not in held_idx][:n_calib]
+    return calib, held
+
+def to_tensor(img: np.ndarray, size: int) -> np.ndarray:
+    # the same preprocessing OnnxYolo applies at run time
+    canvas, _, _ = letterbox(img, size)
+    return (canvas[..., ::-1].transpose(2, 0, 1)[None] / 255.0).astype(np.float32)
+
+
+class _FrameReader:
+    """Calibration data in the CalibrationDataReader shape onnxruntime expects."""
+
+    def __init__(self, frames: List[np.ndarray], input_name: str, size: int) -> None:
+        self._it = iter(frames)
+        self.input_name, self.size = input_name, size
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        img = next(self._it, None)
+        return None if img is None else {self.input_name: to_tensor(img, self.size)}
+
+    def rewind(self) -> None:
+        pass
+
+
+def quantize(fp32: str, out: str, calib: List[np.ndarray], per_channel: bool, method: str,
+             exclude: List[str]) -> None:
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+
+    ref = OnnxYolo(fp32)
+    size = ref.fixed_size or ONNX_IMGSZ  # what OnnxYolo feeds a dynamic-shape model at run time
+    model = onnx.load(fp32)
+    # the detect head turns raw logits into the confidences our thresholds are tuned on; keep it in FP32
+    skip = [n.name for n in model.graph.node if any(p in n.name for p in exclude)] if exclude else []
+    quantize_static(fp32, out, _FrameReader(calib, ref.input_name, size),
+                    quant_format=QuantFormat.QDQ, activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                    per_channel=per_channel, nodes_to_exclude=skip,
+                    calibrate_method={"minmax": CalibrationMethod.MinMax, "entropy": CalibrationMethod.Entropy,
+                                      "percentile": CalibrationMethod.Percentile}[method])
+    # names metadata is what OnnxYolo reads the class table from
+    q = onnx.load(out)
+    have = {p.key for p in q.metadata_props}
+    for p in model.metadata_props:
+        if p.key not in have:
+            q.metadata_props.append(p)
+    onnx.save(q, out)
+
+
+def _match(a: Detections, b: Detections, iou_thr: float):
+    """Greedy same-class IoU matching -> (pairs [(i, j, iou)], unmatched a, unmatched b)."""
+    if not len(a) or not len(b):
+        return [], list(range(len(a))), list(range(len(b)))
+    iou = iou_matrix(a.xyxy, b.xyxy)
+    iou[a.cls[:, None] != b.cls[None, :]] = 0.0
+    pairs, used_a, used_b = [], set(), set()
+    for flat in np.argsort(-iou, axis=None).tolist():
+        i, j = divmod(flat, len(b))
+        if iou[i, j] < iou_thr:
+            break
+        if i in used_a or j in used_b:
+            continue
+        pairs.append((i, j, float(iou[i, j]))); used_a.add(i); used_b.add(j)
+    return pairs, [i for i in range(len(a)) if i not in used_a], [j for j in range(len(b)) if j not in used_b]
+
+def compare(fp32: OnnxYolo, int8: OnnxYolo, frames: List[np.ndarray], conf: float, iou_thr: float) -> Dict:
+    per: Dict[str, Dict[str, list]] = {}
+    lat = {"fp32": [], "int8": []}
+    for f in frames:
+        t0 = time.perf_counter(); a = fp32.predict(f, conf=conf)[0]
+        t1 = time.perf_counter(); b = int8.predict(f, conf=conf)[0]
+        t2 = time.perf_counter()
+        lat["fp32"].append((t1 - t0) * 1000.0); lat["int8"].append((t2 - t1) * 1000.0)
+        pairs, only_a, only_b = _match(a, b, iou_thr)
+        for i, j, iou in pairs:
+            lab = normalize_label(a.label(i))
+            s = per.setdefault(lab, {"delta": [], "iou": [], "flips": [], "missed": [], "extra": []})
+            s["delta"].append(float(b.conf[j] - a.conf[i])); s["iou"].append(iou)
+            thr = min_effective_conf(lab)
+            s["flips"].append(int((a.conf[i] >= thr) != (b.conf[j] >= thr)))
+        # a box one model has and the other lacks is a flip too when it clears the class threshold
+        for dets, idxs, key in ((a, only_a, "missed"), (b, only_b, "extra")):
+            for k in idxs:
+                lab = normalize_label(dets.label(k))
+                s = per.setdefault(lab, {"delta": [], "iou": [], "flips": [], "missed": [], "extra": []})
+                s[key].append(int(dets.conf[k] >= min_effective_conf(lab)))
+    classes = {}
+    for lab, s in sorted(per.items()):
+        d = np.asarray(s["delta"])
+        classes[lab] = {
+            "matched": len(d),
+            "conf_delta_mean": float(d.mean()) if len(d) else 0.0,
+            "conf_delta_abs_mean": float(np.abs(d).mean()) if len(d) else 0.0,
+            "conf_delta_abs_max": float(np.abs(d).max()) if len(d) else 0.0,
+            "iou_mean": float(np.mean(s["iou"])) if s["iou"] else 0.0,
+            "threshold": min_effective_conf(lab),
+            "threshold_flips": int(sum(s["flips"]) + sum(s["missed"]) + sum(s["extra"])),
+            "fp32_only": len(s["missed"]), "int8_only": len(s["extra"]),
+        }
+    latency = {k: {"mean_ms": float(np.mean(v)), "p95_ms": float(np.percentile(v, 95))} for k, v in lat.items() if v}
+    return {"frames": len(frames), "classes": classes, "latency": latency}
+
+def print_report(rep: Dict) -> None:
+    print(f"{'class':<22}{'matched':>8}{'dconf':>8}{'|dconf|':>9}{'max':>7}{'IoU':>7}{'thr':>6}{'flips':>7}{'fp32+':>7}{'int8+':>7}")
+    for lab, c in rep["classes"].items():
+        print(f"{lab:<22}{c['matched']:>8}{c['conf_delta_mean']:>+8.3f}{c['conf_delta_abs_mean']:>9.3f}"
+              f"{c['conf_delta_abs_max']:>7.3f}{c['iou_mean']:>7.3f}{c['threshold']:>6.2f}{c['threshold_flips']:>7}"
+              f"{c['fp32_only']:>7}{c['int8_only']:>7}")
+    for k, v in rep["latency"].items():
+        print(f"{k}: {v['mean_ms']:.1f} ms mean, {v['p95_ms']:.1f} ms p95 over {rep['frames']} frames")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Quantize a detection model to INT8 ONNX and report how it differs from FP32.")
+    ap.add_argument("model", help=f"weights path or a scope name ({', '.join(DETECTION_MODEL_CANDIDATES)})")
+    ap.add_argument("--calib", required=True, help="folder of calibration images and/or videos")
+    ap.add_argument("--holdout", default=None, help="folder of evaluation frames (default: a split of --calib)")
+    ap.add_argument("--out", default=None, help="INT8 model path (default: <weights>.int8.onnx, which PREFER_INT8_MODELS picks up)")
+    ap.add_argument("--max-calib", type=int, default=200)
+    ap.add_argument("--max-eval", type=int, default=200)
+    ap.add_argument("--method", default="minmax", choices=["minmax", "entropy", "percentile"])
+    ap.add_argument("--per-channel", action="store_true")
+    ap.add_argument("--exclude", nargs="*", default=["/model.22/"], help="node-name substrings kept in FP32 (YOLOv8 detect head)")
+    ap.add_argument("--conf", type=float, default=0.05, help="confidence floor for the comparison")
+    ap.add_argument("--iou", type=float, default=0.5, help="IoU for an FP32/INT8 box pair to count as the same object")
+    ap.add_argument("--report", default=None, help="also write the report as JSON")
+    args = ap.parse_args()
+
+    weights = pick_model_for_scope(args.model) if args.model in DETECTION_MODEL_CANDIDATES else args.model
+    fp32, backend, reason = compiled_model(weights, formats=["onnx"])
+    if backend == "pytorch":
+        raise SystemExit(f"need an ONNX version of {weights}: {reason}")
+    out = args.out or int8_path(weights)
+
+    frames = load_frames(args.calib, args.max_calib + (0 if args.holdout else args.max_eval))
+    if args.holdout:
+        calib, held = frames, load_frames(args.holdout, args.max_eval)
+    else:
+        calib, held = split_frames(frames, args.max_calib, args.max_eval)
+    if not calib or not held:
+        raise SystemExit("no calibration or evaluation frames found")
+    print(f"quantizing {fp32} with {len(calib)} calibration frames -> {out}", file=sys.stderr)
+    quantize(fp32, out, calib, args.per_channel, args.method, args.exclude)
+
+    rep = compare(OnnxYolo(fp32), OnnxYolo(out), held, args.conf, args.iou)
+    rep.update({"fp32": fp32, "int8": out, "method": args.method, "per_channel": args.per_channel})
+    print_report(rep)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as fh:
+            json.dump(rep, fh, indent=2)
+
+if __name__ == "__main__":
+    main()
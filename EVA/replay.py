@@ -0,0 +1,97 @@
+from __future__ import annotations
+import argparse, json, sys, time
+from collections import Counter
+from typing import Dict, Iterator, List, Tuple
+
+from feedback import FeedbackEngine
+
+
+def read_frames(path: str) -> Iterator[Tuple[str, int, List[Dict]]]:
+    """(video, t_ms, dets) for every frame record of a headless.py JSONL file."""
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            rec = json.loads(line)
+            if rec.get("type") == "frame":
+                yield rec.get("video", ""), int(rec.get("t_ms", 0)), rec.get("dets", [])
+
+
+def _overrides(items: List[str], cast) -> Dict[str, object]:
+    out = {}
+    for it in items or []:
+        label, _, val = it.rpartition("=")
+        if not label:
+            raise SystemExit(f"expected LABEL=VALUE, got {it!r}")
+        out[label.strip().lower()] = cast(val)
+    return out
+
+
+def _tracked(label: str, track: int) -> List[Dict]:
+    return [{"label": label, "conf": 0.9, "bbox": [100, 100, 160, 160], "track_id": track}]
+
+# (name, [(t_ms, dets)], expected announce count). Stability is forced to one frame so the
+# cases test the cooldown rules only.
+CHECKS = [
+    # the sign is occluded long enough for its track to end, then picked up again under a new id
+    ("reacquired sign, new track id", [(0, _tracked("stop", 1)), (1000, _tracked("stop", 2))], 1),
+    ("same sign, untracked", [(0, [{"label": "stop", "conf": 0.9, "bbox": [100, 100, 160, 160]}]),
+                              (1000, [{"label": "stop", "conf": 0.9, "bbox": [100, 100, 160, 160]}])], 1),
+    ("same track, class flicker", [(0, _tracked("stop", 1)), (500, _tracked("yield", 1))], 1),
+]
+
+def run_checks() -> bool:
+    """Scripted detection streams through the feedback rules; True when every announce count matches."""
+    clock_ms = [0]
+    engine = FeedbackEngine(clock=lambda: clock_ms[0], strict_stability=False)
+    ok = True
+    for name, frames, want in CHECKS:
+        engine.reset()
+        got = 0
+        for t_ms, dets in frames:
+            clock_ms[0] = t_ms
+            got += engine.update(dets).announce is not None
+        ok &= got == want
+        print(f"{'ok' if got == want else 'FAIL':<6}{name}: {got} announcements, expected {want}", file=sys.stderr)
+    return ok
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Replay recorded detections (headless.py --format jsonl) through the feedback rules.")
+    ap.add_argument("detections", nargs="*", help="JSONL files written by headless.py")
+    ap.add_argument("--threshold", action="append", metavar="LABEL=CONF", help="override CLASS_THRESHOLDS")
+    ap.add_argument("--stable", action="append", metavar="LABEL=FRAMES", help="override CLASS_STABLE_FRAMES")
+    ap.add_argument("--cooldown", action="append", metavar="LABEL=MS", help="override CLASS_COOLDOWNS_MS")
+    ap.add_argument("--events", action="store_true", help="print every announce event")
+    ap.add_argument("--check", action="store_true", help="run the built-in feedback regression cases and exit")
+    args = ap.parse_args()
+    if args.check:
+        sys.exit(0 if run_checks() else 1)
+    if not args.detections:
+        ap.error("no detection files given")
+
+    clock_ms = [0]
+    engine = FeedbackEngine(clock=lambda: clock_ms[0])
+    engine.thresholds.update(_overrides(args.threshold, float))
+    engine.stable_frames.update(_overrides(args.stable, int))
+    engine.cooldowns_ms.update(_overrides(args.cooldown, int))
+
+    announced: Counter = Counter()
+    frames = 0; video = None
+    t0 = time.perf_counter()
+    for path in args.detections:
+        for vid, t_ms, dets in read_frames(path):
+            if vid != video:
+                engine.reset(); video = vid
+            clock_ms[0] = t_ms
+            ev = engine.update(dets)
+            frames += 1
+            if ev.announce:
+                announced[ev.announce] += 1
+                if args.events:
+                    print(f"{vid}\t{t_ms}\t{ev.announce}")
+    dt = time.perf_counter() - t0
+    print(f"{frames} frames replayed in {dt:.2f}s ({frames / dt if dt > 0 else 0.0:.0f} frames/s)", file=sys.stderr)
+    for label, n in announced.most_common():
+        print(f"{label:<22}{n:>6}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
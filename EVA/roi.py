@@ -0,0 +1,85 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from boxops import iou_matrix
+from config import ROI_STATIC, ROI_LEARN, ROI_GRID, ROI_DECAY, ROI_COVERAGE, ROI_MARGIN, ROI_MIN_SAMPLES, ROI_MERGE_IOU
+from utils import TL_SET, normalize_label
+
+Box = Tuple[int, int, int, int]
+FAMILIES = ("traffic_lights", "road_signs")
+
+
+def family_of(label: str) -> str:
+    return "traffic_lights" if normalize_label(label) in TL_SET else "road_signs"
+
+def _span(mass: np.ndarray, coverage: float) -> Tuple[int, int]:
+    """Smallest index range on a 1-D histogram that holds `coverage` of its mass (tails cut evenly)."""
+    cdf = np.cumsum(mass)
+    total = cdf[-1]
+    tail = (1.0 - coverage) / 2.0 * total
+    lo = int(np.searchsorted(cdf, tail, side="right"))
+    hi = int(np.searchsorted(cdf, total - tail, side="left"))
+    return lo, max(lo, hi)
+
+
+class RoiLearner:
+    """Where each class family shows up, learned from a decaying heat map of detection centres.
+
+    Until a family has ROI_MIN_SAMPLES detections its ROI is the configured ROI_STATIC box."""
+
+    def __init__(self, grid: Tuple[int, int] = ROI_GRID, decay: float = ROI_DECAY, coverage: float = ROI_COVERAGE,
+                 margin: float = ROI_MARGIN, min_samples: int = ROI_MIN_SAMPLES, learn: bool = ROI_LEARN) -> None:
+        self.gw, self.gh = int(grid[0]), int(grid[1])
+        self.decay = float(decay)
+        self.coverage = float(coverage)
+        self.margin = float(margin)
+        self.min_samples = int(min_samples)
+        self.learn = bool(learn)
+        self.static: Dict[str, Tuple[float, float, float, float]] = dict(ROI_STATIC)
+        self.reset()
+
+    def reset(self) -> None:
+        self.heat = {f: np.zeros((self.gh, self.gw), np.float32) for f in FAMILIES}
+        self.samples = {f: 0 for f in FAMILIES}
+
+    def add(self, xyxy: np.ndarray, labels: Sequence[str], frame_shape) -> None:
+        if not self.learn or not len(labels):
+            return
+        h, w = frame_shape[:2]
+        cx = np.clip(((xyxy[:, 0] + xyxy[:, 2]) * 0.5 / w * self.gw).astype(int), 0, self.gw - 1)
+        cy = np.clip(((xyxy[:, 1] + xyxy[:, 3]) * 0.5 / h * self.gh).astype(int), 0, self.gh - 1)
+        fams = np.asarray([family_of(lab) for lab in labels])
+        for f in FAMILIES:
+            sel = fams == f
+            if not sel.any():
+                continue
+            self.heat[f] *= self.decay
+            np.add.at(self.heat[f], (cy[sel], cx[sel]), 1.0)
+            self.samples[f] += int(sel.sum())
+
+    def roi(self, family: str, frame_shape) -> Box:
+        h, w = frame_shape[:2]
+        if self.samples.get(family, 0) >= self.min_samples:
+            heat = self.heat[family]
+            x0, x1 = _span(heat.sum(axis=0), self.coverage)
+            y0, y1 = _span(heat.sum(axis=1), self.coverage)
+            nx1, ny1 = x0 / self.gw - self.margin, y0 / self.gh - self.margin
+            nx2, ny2 = (x1 + 1) / self.gw + self.margin, (y1 + 1) / self.gh + self.margin
+        else:
+            nx1, ny1, nx2, ny2 = self.static.get(family, (0.0, 0.0, 1.0, 1.0))
+        x1 = int(np.clip(nx1, 0, 1) * w); x2 = int(np.clip(nx2, 0, 1) * w)
+        y1 = int(np.clip(ny1, 0, 1) * h); y2 = int(np.clip(ny2, 0, 1) * h)
+        if x2 - x1 < 32 or y2 - y1 < 32:
+            return 0, 0, w, h
+        return x1, y1, x2, y2
+
+    def regions(self, families: Sequence[str], frame_shape) -> List[Tuple[Box, Optional[List[str]]]]:
+        """[(box, families it serves or None for all)], heavily overlapping crops merged into one."""
+        out: List[Tuple[Box, Optional[List[str]]]] = [(self.roi(f, frame_shape), [f]) for f in families]
+        if len(out) == 2:
+            (a, fa), (b, fb) = out
+            if iou_matrix([a], [b])[0, 0] >= ROI_MERGE_IOU:
+                out = [((min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])), None)]
+        return out
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+from boxops import iou_matrix
+from detections import Detections
+from config import (TRACKER_DETECT_EVERY, TRACKER_ADAPTIVE, TRACKER_CONFIDENT_HITS, TRACKER_IOU,
+                    TRACKER_MAX_MISSES, TRACKER_ALPHA, TRACKER_BETA)
+
+
+@dataclass
+class Track:
+    id: int
+    cls: int
+    box: np.ndarray                  # xyxy, predicted for the current frame
+    conf: float
+    vel: np.ndarray = field(default_factory=lambda: np.zeros(4, np.float32))  # px per frame
+    hits: int = 1
+    misses: int = 0                  # detector passes without a match
+    since_update: int = 0            # frames since the last match
+
+
+class IouTracker:
+    """Same-class IoU association with an alpha-beta filter on the box corners.
+
+    update() takes a detector pass and returns it with persistent track ids; predict() carries the
+    tracks forward on frames the detector skipped. A track survives TRACKER_MAX_MISSES unmatched
+    detector passes, so a sign that flickers out for a frame keeps its id."""
+
+    def __init__(self, detect_every: int = TRACKER_DETECT_EVERY, adaptive: bool = TRACKER_ADAPTIVE,
+                 confident_hits: int = TRACKER_CONFIDENT_HITS, iou_thr: float = TRACKER_IOU,
+                 max_misses: int = TRACKER_MAX_MISSES, alpha: float = TRACKER_ALPHA, beta: float = TRACKER_BETA) -> None:
+        self.detect_every = max(1, int(detect_every))
+        self.adaptive = bool(adaptive)
+        self.confident_hits = int(confident_hits)
+        self.iou_thr = float(iou_thr)
+        self.max_misses = int(max_misses)
+        self.alpha = float(alpha)
+        self.beta = float(beta)
+        self.reset()
+
+    def reset(self) -> None:
+        self.tracks: List[Track] = []
+        self.names: Dict[int, str] = {}
+        self._next_id = 1
+        self._since_detect = 0
+        self.stats = {"detected": 0, "tracked": 0}
+
+    def should_detect(self) -> bool:
+        """True when this frame needs a detector pass: every `detect_every` frames, or every frame
+        while adaptive and some track is still tentative."""
+        if self._since_detect + 1 >= self.detect_every:
+            return True
+        return self.adaptive and any(t.hits < self.confident_hits for t in self.tracks)
+
+    def _advance(self) -> None:
+        for t in self.tracks:
+            t.box = t.box + t.vel
+            t.since_update += 1
+
+    def predict(self) -> Detections:
+        self._advance()
+        self._since_detect += 1
+        self.stats["tracked"] += 1
+        return self._output()
+
+    def update(self, dets: Detections) -> Detections:
+        self._advance()
+        self._since_detect = 0
+        self.stats["detected"] += 1
+        self.names = dets.names
+        matched = self._associate(dets)
+        for t in self.tracks:
+            if t.id not in matched:
+                t.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+        taken = set(matched.values())
+        for j in range(len(dets)):
+            if j not in taken:
+                self.tracks.append(Track(self._next_id, int(dets.cls[j]), dets.xyxy[j].copy(), float(dets.conf[j])))
+                self._next_id += 1
+        return self._output()
+
+    def _associate(self, dets: Detections) -> Dict[int, int]:
+        """Greedy highest-IoU matching within a class; updates the matched tracks, returns {track id: det index}."""
+        if not self.tracks or not len(dets):
+            return {}
+        boxes = np.stack([t.box for t in self.tracks])
+        cls = np.asarray([t.cls for t in self.tracks])
+        iou = iou_matrix(boxes, dets.xyxy)
+        iou[cls[:, None] != dets.cls[None, :]] = 0.0
+        matched: Dict[int, int] = {}
+        used = set()
+        for flat in np.argsort(-iou, axis=None).tolist():
+            i, j = divmod(flat, len(dets))
+            if iou[i, j] < self.iou_thr:
+                break
+            t = self.tracks[i]
+            if t.id in matched or j in used:
+                continue
+            matched[t.id] = j; used.add(j)
+            resid = dets.xyxy[j] - t.box
+            t.box = t.box + self.alpha * resid
+            t.vel = t.vel + self.beta * resid / t.since_update
+            t.conf = float(dets.conf[j])
+            t.hits += 1; t.misses = 0; t.since_update = 0
+        return matched
+
+    def _output(self) -> Detections:
+        if not self.tracks:
+            return Detections.empty(self.names)
+        return Detections(np.stack([t.box for t in self.tracks]), [t.conf for t in self.tracks],
+                          [t.cls for t in self.tracks], self.names, [t.id for t in self.tracks])
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import hashlib, os, subprocess, threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from config import ESPEAKNG_BIN, TTS_CACHE_DIR, TTS_CACHE_MAX_MB
+
+
+class PhraseCache:
+    """espeak-ng output rendered once to WAV, one file per (text, voice, rate, amplitude).
+
+    Files live in `cache_dir` and are named by a hash of the key, so a changed voice or rate
+    simply renders new files. Playing a file bumps its mtime; above `max_mb` the least recently
+    played files are deleted."""
+
+    def __init__(self, cache_dir: Path = TTS_CACHE_DIR, max_mb: float = TTS_CACHE_MAX_MB,
+                 espeak_bin: str = ESPEAKNG_BIN) -> None:
+        self.dir = Path(cache_dir)
+        self.max_bytes = int(float(max_mb) * 1e6)
+        self.bin = espeak_bin
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, voice: str, rate: int, amp: int) -> str:
+        return hashlib.sha1(f"{text}|{voice}|{int(rate)}|{int(amp)}".encode("utf-8")).hexdigest()
+
+    def path(self, text: str, voice: str, rate: int, amp: int) -> Path:
+        return self.dir / f"{self.key(text, voice, rate, amp)}.wav"
+
+    def get(self, text: str, voice: str, rate: int, amp: int) -> Optional[Path]:
+        p = self.path(text, voice, rate, amp)
+        try:
+            os.utime(p)
+        except OSError:
+            return None
+        return p
+
+    def render(self, text: str, voice: str, rate: int, amp: int) -> Optional[Path]:
+        p = self.path(text, voice, rate, amp)
+        if p.is_file():
+            return p
+        tmp = p.with_name(f"{p.stem}.{threading.get_ident()}.tmp")
+        cmd = [self.bin, "-w", str(tmp)]
+        if voice: cmd += ["-v", str(voice)]
+        if rate: cmd += ["-s", str(int(rate))]
+        if amp: cmd += ["-a", str(int(amp))]
+        cmd += [text]
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            os.replace(tmp, p)
+        except Exception:
+            try: os.remove(tmp)
+            except OSError: pass
+            return None
+        self._evict()
+        return p
+
+    def prerender(self, texts: Iterable[str], voice: str, rate: int, amp: int) -> threading.Thread:
+        """Renders the missing phrases on a background thread."""
+        texts = [t for t in dict.fromkeys(texts) if t]
+        th = threading.Thread(target=lambda: [self.render(t, voice, rate, amp) for t in texts], daemon=True)
+        th.start()
+        return th
+
+    def _evict(self) -> None:
+        with self._lock:
+            try:
+                files = [(f.stat().st_mtime, f.stat().st_size, f) for f in self.dir.glob("*.wav")]
+            except OSError:
+                return
+            total = sum(size for _, size, _ in files)
+            for _, size, f in sorted(files, key=lambda x: x[0]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    f.unlink(); total -= size
+                except OSError:
+                    pass
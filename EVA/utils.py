@@ -3,6 +3,8 @@ import time
 from collections import Counter
 from typing import List, Optional
 
+TL_SET = {"red", "yellow", "green"}
+
 def now_ms() -> int:
     return int(time.time() * 1000)
 
@@ -20,7 +22,7 @@ def normalize_label(label: str) -> str:
 def choose_priority_label(labels: List[str]) -> Optional[str]:
     if not labels:
         return None
-    tl = [l for l in labels if l in {"red", "yellow", "green"}]
+    tl = [l for l in labels if l in TL_SET]
     if not tl:
         return None
     c = Counter(tl)
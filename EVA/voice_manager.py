@@ -1,17 +1,42 @@
 from __future__ import annotations
-import threading, queue, subprocess
-from typing import Optional
-from config import ESPEAKNG_BIN, ESPEAKNG_VOICE_EN, ESPEAKNG_VOICE_TL, ESPEAKNG_RATE_WPM, ESPEAKNG_AMPLITUDE
+import threading, subprocess
+from typing import Dict, Iterable, Optional
+
+try:
+    import pygame
+    _HAVE_PYGAME = True
+except Exception:
+    _HAVE_PYGAME = False
+
+from config import ESPEAKNG_BIN, ESPEAKNG_VOICE_EN, ESPEAKNG_VOICE_TL, ESPEAKNG_RATE_WPM, ESPEAKNG_AMPLITUDE, TTS_CACHE_ENABLED
+from announcer import Announcer
+from mp3_manager import init_mixer
+from tts_cache import PhraseCache
+
+def _init_mixer() -> bool:
+    if not _HAVE_PYGAME:
+        return False
+    try:
+        init_mixer()
+        return True
+    except Exception:
+        return False
 
 class SpeechManager:
     def __init__(self, rate_wpm: int = 165, amplitude: int = 175) -> None:
-        self._q = queue.Queue()  # type: queue.Queue[tuple[str, str]]
+        self.announcer = Announcer()
+        self.announcer.on_preempt = self._cut
+        self._playing = None  # Sound or espeak-ng process being heard now
         self._stop = threading.Event()
         self._muted = False
         self.rate_wpm = int(rate_wpm or ESPEAKNG_RATE_WPM)
         self.amplitude = int(amplitude or ESPEAKNG_AMPLITUDE)
         self.lang = "en"
         self.voice_override = {"en": ESPEAKNG_VOICE_EN, "tl": ESPEAKNG_VOICE_TL}
+        # cached phrases play from memory; anything not rendered yet is spoken live and rendered for next time
+        self.cache = PhraseCache() if TTS_CACHE_ENABLED and _init_mixer() else None
+        self._sounds: Dict[str, object] = {}
+        self._requested = set()   # (voice, rate, amplitude, text), the same parts the cache keys on
         self.worker = threading.Thread(target=self._run, daemon=True)
         self.worker.start()
 
@@ -20,37 +45,93 @@ class SpeechManager:
         if voice_override:
             self.voice_override[self.lang] = voice_override
 
+    def prerender(self, phrases: Dict[str, Iterable[str]]) -> None:
+        """Renders {lang: phrases} into the cache in the background."""
+        if self.cache is None:
+            return
+        for lang, texts in phrases.items():
+            texts, voice = list(texts), self._voice(lang)
+            self._requested.update((voice, self.rate_wpm, self.amplitude, t) for t in texts)
+            self.cache.prerender(texts, voice, self.rate_wpm, self.amplitude)
+
     def mute(self, flag: bool) -> None:
         self._muted = bool(flag)
 
     def say(self, text: str) -> None:
         self.speak(text, times=1)
 
-    def speak(self, text: str, times: int = 1) -> None:
+    def speak(self, text: str, times: int = 1, label: Optional[str] = None) -> None:
+        """Queues `text`; `label` sets its priority and lets it be merged with a pending duplicate."""
         if not text or self._muted:
             return
-        for _ in range(max(1, int(times))):
-            self._q.put((self.lang, text))
+        self.announcer.submit(label, (self.lang, text), times)
 
     def stop(self) -> None:
         self._stop.set()
+        self.announcer.preempted.set()
+        self._cut()
+
+    def _cut(self) -> None:
+        p = self._playing
+        try:
+            if isinstance(p, subprocess.Popen):
+                p.kill()
+            elif p is not None:
+                p.stop()
+        except Exception:
+            pass
 
     def _run(self) -> None:
         while not self._stop.is_set():
-            try:
-                lang, text = self._q.get(timeout=0.1)
-            except queue.Empty:
+            prompt = self.announcer.next(timeout=0.1)
+            if prompt is None:
                 continue
-            self._synth(lang, text)
+            lang, text = prompt.payload
+            for i in range(prompt.times):
+                if self._stop.is_set() or self.announcer.preempted.is_set():
+                    break
+                if not self._play_cached(lang, text, prompt if i == 0 else None):
+                    self._synth(lang, text, prompt if i == 0 else None)
+            self._playing = None
+
+    def _voice(self, lang: str) -> str:
+        return self.voice_override.get(lang) or ("tl" if lang == "tl" else "en")
+
+    def _play_cached(self, lang: str, text: str, prompt=None) -> bool:
+        if self.cache is None:
+            return False
+        voice = self._voice(lang)
+        path = self.cache.get(text, voice, self.rate_wpm, self.amplitude)
+        if path is None:
+            req = (voice, self.rate_wpm, self.amplitude, text)
+            if req not in self._requested:
+                self._requested.add(req)
+                self.cache.prerender([text], voice, self.rate_wpm, self.amplitude)
+            return False
+        snd = self._sounds.get(str(path))
+        try:
+            if snd is None:
+                snd = self._sounds[str(path)] = pygame.mixer.Sound(str(path))
+            snd.play()
+        except Exception:
+            return False
+        self._playing = snd
+        if prompt is not None:
+            self.announcer.started(prompt)
+        self.announcer.preempted.wait(snd.get_length())  # keep repeats back to back, like the blocking subprocess did
+        return True
 
-    def _synth(self, lang: str, text: str) -> None:
-        voice = self.voice_override.get(lang) or ("tl" if lang == "tl" else "en")
+    def _synth(self, lang: str, text: str, prompt=None) -> None:
+        voice = self._voice(lang)
         cmd = [ESPEAKNG_BIN]
         if voice: cmd += ["-v", str(voice)]
         if self.rate_wpm: cmd += ["-s", str(int(self.rate_wpm))]
         if self.amplitude: cmd += ["-a", str(int(self.amplitude))]
         cmd += [text]
         try:
-            subprocess.run(cmd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self._playing = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if prompt is not None:
+                self.announcer.started(prompt)  # process start; espeak-ng still has to synthesize
+            self._playing.wait()
         except Exception:
             pass